@@ -0,0 +1,67 @@
+"""ASGI handler of api_yamdb.asgi."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.core.handlers import asgi
+from django.db import connections
+
+
+def response_headers(response):
+    """Headers and cookies of a response as ASGI sends them."""
+    headers = []
+    for header, value in response.items():
+        if isinstance(header, str):
+            header = header.encode('ascii')
+        if isinstance(value, str):
+            value = value.encode('latin1')
+        headers.append((bytes(header), bytes(value)))
+    for cookie in response.cookies.values():
+        headers.append(
+            (b'Set-Cookie', cookie.output(header='').encode('ascii').strip())
+        )
+    return headers
+
+
+def read_part(parts):
+    return next(parts, None)
+
+
+class ASGIHandler(asgi.ASGIHandler):
+    """ASGIHandler reading streaming response bodies in a thread.
+
+    Django 3.2 iterates a StreamingHttpResponse on the event loop, where
+    the queries of a body built lazily, like that of the export view,
+    raise SynchronousOnlyOperation. The body of each streaming response
+    is read in a thread of its own, which keeps the database connection
+    of its cursor, and the connection is closed with the body.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': response_headers(response),
+        })
+        loop = asyncio.get_running_loop()
+        parts = iter(response)
+        with ThreadPoolExecutor(max_workers=1) as reader:
+            try:
+                while True:
+                    part = await loop.run_in_executor(
+                        reader, read_part, parts
+                    )
+                    if part is None:
+                        break
+                    for chunk, _ in self.chunk_bytes(part):
+                        await send({
+                            'type': 'http.response.body',
+                            'body': chunk,
+                            'more_body': True,
+                        })
+                await send({'type': 'http.response.body'})
+            finally:
+                await loop.run_in_executor(reader, connections.close_all)
+        await sync_to_async(response.close, thread_sensitive=True)()
@@ -0,0 +1,53 @@
+"""Async versions of the hot read paths, used under ASGI.
+
+Django runs a sync view of an ASGI request in the one thread it keeps for
+thread-sensitive code, so a single slow request holds up every other.
+The views of ASYNC_ROUTES are wrapped in async views that run GET and
+HEAD requests in the thread pool of the event loop instead; other
+methods stay in the thread-sensitive thread. Authentication, permissions
+and caching are those of the wrapped DRF view.
+"""
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.urls import URLPattern
+
+from .routers import SAFE_METHODS
+
+ASYNC_ROUTES = (
+    'titles-list', 'titles-detail', 'reviews-list', 'comments-list',
+)
+
+
+def run_view(view, request, *args, **kwargs):
+    # django only closes the connections of the thread sending
+    # request_started and request_finished, not those of pool threads
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if callable(getattr(response, 'render', None)):
+            response = response.render()
+    finally:
+        close_old_connections()
+    return response
+
+
+def async_read_view(view):
+    async def read_view(request, *args, **kwargs):
+        run = sync_to_async(
+            run_view, thread_sensitive=request.method not in SAFE_METHODS
+        )
+        return await run(view, request, *args, **kwargs)
+    # keeps csrf_exempt and the cls, actions of DRF views
+    return update_wrapper(read_view, view)
+
+
+def async_read_routes(patterns, names=ASYNC_ROUTES):
+    """Copy of the url patterns with the views of names made async."""
+    return [
+        URLPattern(pattern.pattern, async_read_view(pattern.callback),
+                   pattern.default_args, pattern.name)
+        if pattern.name in names else pattern
+        for pattern in patterns
+    ]
@@ -0,0 +1,60 @@
+import threading
+import time
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+_users = {}
+_users_lock = threading.Lock()
+
+
+def user_cache_ttl():
+    return getattr(settings, 'JWT_USER_CACHE_TTL', 30)
+
+
+def invalidate_user(pk):
+    with _users_lock:
+        _users.pop(pk, None)
+
+
+def clear_user_cache():
+    with _users_lock:
+        _users.clear()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication with users kept in a per-process TTL cache.
+
+    A saved or deleted user is dropped from the cache of the process that
+    saved it, other gunicorn workers see role and is_active changes after
+    JWT_USER_CACHE_TTL seconds at most. Every request gets its own copy of
+    the user, so views can change request.user freely.
+    """
+    max_users = 10000
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        now = time.monotonic()
+        with _users_lock:
+            entry = _users.get(user_id)
+        if entry is not None and entry[0] > now:
+            _expires, db, names, values = entry
+            return self.user_model.from_db(db, names, values)
+        # raises for unknown and inactive users, those are never cached
+        user = super().get_user(validated_token)
+        names = [field.attname for field in user._meta.concrete_fields]
+        values = [getattr(user, name) for name in names]
+        with _users_lock:
+            if len(_users) >= self.max_users:
+                _users.clear()
+            _users[user_id] = (now + user_cache_ttl(), user._state.db,
+                               names, values)
+        return user
@@ -0,0 +1,164 @@
+from django.db import connection, transaction
+from django.db.models import F
+from rest_framework.exceptions import ValidationError
+
+from .cache import invalidate
+from .models import Category, Genre, Title
+from .serializers import TitlesSerializer
+
+BULK_LIMIT = 1000
+
+TitleGenre = Title.genre.through
+
+
+def slug_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list) and all(isinstance(v, str) for v in value):
+        return value
+    return None
+
+
+def validate_items(items):
+    """Validate every item on its own, return ([(index, fields)], errors).
+
+    Slugs of all items are resolved with one query for genres and one for
+    categories.
+    """
+    genre_slugs, category_slugs = set(), set()
+    for item in items:
+        if isinstance(item, dict):
+            genre_slugs.update(slug_list(item.get('genre')) or ())
+            if isinstance(item.get('category'), str):
+                category_slugs.add(item['category'])
+    genres = dict(Genre.objects.filter(slug__in=genre_slugs).values_list(
+        'slug', 'id'
+    )) if genre_slugs else {}
+    categories = dict(Category.objects.filter(
+        slug__in=category_slugs
+    ).values_list('slug', 'id')) if category_slugs else {}
+
+    # one serializer for all items, its fields are built only once
+    serializer = TitlesSerializer()
+    valid, errors = [], {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[index] = {'non_field_errors': ['Expected an object']}
+            continue
+        try:
+            validated, item_errors = serializer.run_validation(item), {}
+        except ValidationError as error:
+            validated, item_errors = None, dict(error.detail)
+        slugs = slug_list(item.get('genre'))
+        if slugs is None:
+            item_errors['genre'] = ['Expected a list of slugs']
+        elif set(slugs) - set(genres):
+            unknown = ', '.join(sorted(set(slugs) - set(genres)))
+            item_errors['genre'] = [f'Unknown slugs: {unknown}']
+        category = item.get('category')
+        if category is not None and not isinstance(category, str):
+            item_errors['category'] = ['Expected a slug']
+        elif category is not None and category not in categories:
+            item_errors['category'] = [f'Unknown slug: {category}']
+        pk = item.get('id')
+        if pk is not None and (not isinstance(pk, int)
+                               or isinstance(pk, bool)):
+            item_errors['id'] = ['A valid integer is required.']
+        if item_errors:
+            errors[index] = item_errors
+            continue
+        valid.append((index, {
+            'id': pk,
+            'name': validated['name'],
+            'year': validated['year'],
+            'description': validated.get('description', ''),
+            'category_id': categories.get(category),
+            'genre_ids': sorted({genres[slug] for slug in slugs}),
+        }))
+    return valid, errors
+
+
+def create_titles(titles):
+    if not titles or connection.features.can_return_rows_from_bulk_insert:
+        return Title.objects.bulk_create(titles)
+    if connection.vendor == 'sqlite':
+        # SQLite holds the write lock from the first INSERT to the commit,
+        # so the last ids are the rows inserted here, in insertion order
+        Title.objects.bulk_create(titles)
+        ids = Title.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        )[:len(titles)]
+        for title, pk in zip(titles, sorted(ids)):
+            title.pk = pk
+            title._state.adding = False
+        return titles
+    # no way to learn the ids of a bulk insert here
+    for title in titles:
+        title.save(force_insert=True)
+    return titles
+
+
+def bulk_upsert_titles(items):
+    """Create titles, or update those given with an id.
+
+    Returns a list with a result per item, in the order of the items:
+    {'status': 'created' | 'updated', 'title': {...}} or
+    {'status': 'error', 'errors': {...}}.
+    """
+    valid, errors = validate_items(items)
+    results = [None] * len(items)
+    for index, item_errors in errors.items():
+        results[index] = {'status': 'error', 'errors': item_errors}
+    with transaction.atomic():
+        existing = Title.objects.in_bulk(
+            [fields['id'] for _, fields in valid if fields['id'] is not None]
+        )
+        created, updated, genre_ids, seen = [], [], {}, set()
+        for index, fields in valid:
+            pk = fields['id']
+            if pk is not None and (pk not in existing or pk in seen):
+                results[index] = {'status': 'error', 'errors': {'id': [
+                    'Not found.' if pk not in existing
+                    else 'Duplicate id in the batch.'
+                ]}}
+                continue
+            seen.add(pk)
+            title = existing[pk] if pk is not None else Title()
+            title.name = fields['name']
+            title.year = fields['year']
+            title.description = fields['description']
+            title.category_id = fields['category_id']
+            (updated if pk is not None else created).append((index, title))
+            genre_ids[index] = fields['genre_ids']
+        create_titles([title for _, title in created])
+        if updated:
+            Title.objects.bulk_update(
+                [title for _, title in updated],
+                ['name', 'year', 'description', 'category'],
+            )
+            updated_ids = [title.pk for _, title in updated]
+            TitleGenre.objects.filter(title_id__in=updated_ids).delete()
+            Title.objects.filter(pk__in=updated_ids).update(
+                version=F('version') + 1
+            )
+        TitleGenre.objects.bulk_create([
+            TitleGenre(title_id=title.pk, genre_id=genre_id)
+            for index, title in created + updated
+            for genre_id in genre_ids[index]
+        ])
+    if created or updated:
+        invalidate('titles', 'leaderboards')
+    saved = Title.objects.with_relations().in_bulk(
+        [title.pk for _, title in created + updated]
+    )
+    done = [('created', index, title) for index, title in created] + [
+        ('updated', index, title) for index, title in updated
+    ]
+    data = TitlesSerializer(
+        [saved[title.pk] for _, _, title in done], many=True
+    ).data
+    for (status, index, _), title_data in zip(done, data):
+        results[index] = {'status': status, 'title': title_data}
+    return results
@@ -0,0 +1,124 @@
+import hashlib
+import time
+from urllib.parse import quote, urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.filters import SearchFilter
+from rest_framework.response import Response
+
+from .routers import replica_alias
+
+# of the host, path and query part of a key, memcached refuses keys over
+# 250 characters
+LOCATION_KEY_LENGTH = 200
+
+
+def get_cache():
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+
+def version_key(namespace):
+    return f'catalog:{namespace}:version'
+
+
+def new_version():
+    # an evicted version key must not bring back entries of an old version
+    return time.time_ns()
+
+
+def get_version(cache, namespace):
+    version = cache.get(version_key(namespace))
+    if version is None:
+        cache.add(version_key(namespace), new_version(), timeout=None)
+        version = cache.get(version_key(namespace))
+    return version
+
+
+def invalidate(*namespaces):
+    cache = get_cache()
+    for namespace in namespaces:
+        try:
+            cache.incr(version_key(namespace))
+        except ValueError:
+            cache.set(version_key(namespace), new_version(), timeout=None)
+
+
+def invalidate_on_commit(*namespaces):
+    """invalidate() once the current transaction commits.
+
+    Bumped before the commit, a version could get entries of a concurrent
+    read of the old rows cached under it.
+    """
+    transaction.on_commit(lambda: invalidate(*namespaces))
+
+
+class CachedResponseMixin:
+    """Read-through cache of list/retrieve response data.
+
+    Entries are keyed by a per-namespace version, bumping it with
+    invalidate() drops every entry of the namespace at once.
+    """
+    cache_namespace = None
+
+    def get_cache_query_params(self):
+        params = set()
+        filterset_class = getattr(self, 'filterset_class', None)
+        if filterset_class is not None:
+            params.update(filterset_class.base_filters)
+        for backend in self.filter_backends:
+            if issubclass(backend, SearchFilter):
+                params.add(backend.search_param)
+        paginator = self.paginator
+        if paginator is not None:
+            params.update(
+                getattr(paginator, name) for name in (
+                    'page_query_param', 'page_size_query_param',
+                    'cursor_query_param',
+                ) if getattr(paginator, name, None)
+            )
+        return params
+
+    def get_cache_key(self, request):
+        query = urlencode([
+            (param, request.query_params.getlist(param))
+            for param in sorted(self.get_cache_query_params())
+            if param in request.query_params
+        ], doseq=True)
+        # quoted, memcached also refuses whitespace and control characters
+        location = f'{request.get_host()}{quote(request.path)}?{query}'
+        if len(location) > LOCATION_KEY_LENGTH:
+            location = hashlib.md5(location.encode()).hexdigest()
+        cache = get_cache()
+        version = get_version(cache, self.cache_namespace)
+        return f'catalog:{self.cache_namespace}:{version}:{location}'
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = getattr(settings, 'CATALOG_CACHE_TIMEOUT', 600)
+            if replica_alias() is not None:
+                # a lagging replica may still show what the version bump
+                # was about, do not keep that for long
+                timeout = min(timeout, getattr(
+                    settings, 'REPLICA_CACHE_TIMEOUT', 30
+                ))
+            cache.set(key, response.data, timeout)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,47 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+
+
+class ConditionalGetMixin:
+    """ETag support for list/retrieve built from a version counter.
+
+    get_etag_version() must be cheap: on a matching If-None-Match the
+    response is 304 before the list query or any serialization runs.
+    """
+    conditional_actions = ('list', 'retrieve')
+
+    def get_etag_version(self):
+        raise NotImplementedError
+
+    def get_etag(self, request):
+        if self.action not in self.conditional_actions:
+            return None
+        version = self.get_etag_version()
+        if version is None:
+            return None
+        key = (f'{request.get_full_path()}:{request.accepted_media_type}:'
+               f'{version}')
+        return '"%s"' % hashlib.md5(key.encode()).hexdigest()
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        if etag is not None:
+            response = get_conditional_response(request, etag=etag)
+            if response is not None:
+                response['ETag'] = etag
+                return response
+        response = handler(request, *args, **kwargs)
+        if etag is not None and response.status_code == 200:
+            response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
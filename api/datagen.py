@@ -0,0 +1,126 @@
+import random
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from .cache import invalidate
+from .leaderboards import refresh
+from .management.commands.import_csv import keep_auto_now_add
+from .management.commands.rebuild_ratings import rebuild_ratings
+from .models import Category, Comment, Genre, Review, Title
+
+User = get_user_model()
+
+DEFAULT_SIZES = {
+    'users': 1000,
+    'categories': 10,
+    'genres': 30,
+    'titles': 5000,
+    'reviews': 100000,
+    'comments': 50000,
+}
+
+
+def generate_options(options):
+    names = (*DEFAULT_SIZES, 'seed', 'skew', 'prefix')
+    return {name: options[name] for name in names}
+
+
+def add_size_arguments(parser, **defaults):
+    sizes = dict(DEFAULT_SIZES, **defaults)
+    for name, default in sizes.items():
+        parser.add_argument(f'--{name}', type=int, default=default)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--skew', type=float, default=1.1,
+        help='Zipf exponent of reviews per title and comments per review'
+    )
+    parser.add_argument(
+        '--prefix', default='gen',
+        help='Prefix of generated emails and slugs, must be unique per run'
+    )
+
+
+def zipf_counts(total, buckets, skew, cap=None):
+    """Split total over buckets, the first bucket is the most popular."""
+    weights = [1 / (rank + 1) ** skew for rank in range(buckets)]
+    scale = total / sum(weights)
+    counts = [round(weight * scale) for weight in weights]
+    if cap is not None:
+        counts = [min(count, cap) for count in counts]
+    return counts
+
+
+def bulk_insert(model, objects, batch_size=2000):
+    """bulk_create a generator in batches, return the new primary keys."""
+    last = model.objects.order_by('-pk').values_list('pk', flat=True).first()
+    with keep_auto_now_add(model):
+        while True:
+            batch = list(islice(objects, batch_size))
+            if not batch:
+                break
+            model.objects.bulk_create(batch)
+    return list(model.objects.filter(pk__gt=last or 0).order_by(
+        'pk'
+    ).values_list('pk', flat=True))
+
+
+def generate(users, categories, genres, titles, reviews, comments,
+             seed=0, skew=1.1, prefix='gen'):
+    """Create a catalog where a few titles get most of the reviews.
+
+    Returns title ids ordered from the most to the least reviewed.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+
+    def published():
+        return now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+
+    user_ids = bulk_insert(User, (
+        User(email=f'{prefix}{i}@yamdb.fake', username=f'{prefix}{i}')
+        for i in range(users)
+    ))
+    category_ids = bulk_insert(Category, (
+        Category(name=f'Category {i}', slug=f'{prefix}-category-{i}')
+        for i in range(categories)
+    ))
+    genre_ids = bulk_insert(Genre, (
+        Genre(name=f'Genre {i}', slug=f'{prefix}-genre-{i}')
+        for i in range(genres)
+    ))
+    title_ids = bulk_insert(Title, (
+        Title(name=f'Title {i}', year=rng.randint(1900, 2020),
+              category_id=rng.choice(category_ids) if category_ids else None,
+              description='Description ' * rng.randint(1, 20))
+        for i in range(titles)
+    ))
+    bulk_insert(Title.genre.through, (
+        Title.genre.through(title_id=title_id, genre_id=genre_id)
+        for title_id in title_ids
+        for genre_id in rng.sample(genre_ids, min(len(genre_ids),
+                                                  rng.randint(1, 3)))
+    ))
+    rng.shuffle(title_ids)
+    review_counts = zipf_counts(reviews, len(title_ids), skew, len(user_ids))
+    review_ids = bulk_insert(Review, (
+        Review(title_id=title_id, author_id=author_id,
+               text='Review ' * rng.randint(5, 50),
+               score=rng.randint(1, 10), pub_date=published())
+        for title_id, count in zip(title_ids, review_counts)
+        for author_id in rng.sample(user_ids, count)
+    ))
+    # reviews were inserted title by title, most reviewed first
+    comment_counts = zipf_counts(comments, len(review_ids), skew)
+    bulk_insert(Comment, (
+        Comment(review_id=review_id, author_id=rng.choice(user_ids),
+                text='Comment ' * rng.randint(1, 20), pub_date=published())
+        for review_id, count in zip(review_ids, comment_counts)
+        for _ in range(count)
+    ))
+    rebuild_ratings()
+    refresh(full=True)
+    invalidate('titles', 'genres', 'categories')
+    return title_ids
@@ -0,0 +1,41 @@
+"""Execute wrappers that follow the request instead of the thread.
+
+connection.execute_wrapper() only wraps the connections of the calling
+thread, while under ASGI a request runs its middleware on the event loop
+and its view in a worker thread (see api.async_views). query_hooks() puts
+wrappers in a context variable, which sync_to_async() carries into the
+worker thread, and every connection runs the wrappers of the current
+context.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_hooks = ContextVar('query_hooks', default=())
+
+
+@contextmanager
+def query_hooks(*hooks):
+    """Wrap the queries run in the block like connection.execute_wrapper()."""
+    token = _hooks.set(_hooks.get() + hooks)
+    try:
+        yield
+    finally:
+        _hooks.reset(token)
+
+
+def run_hooks(execute, sql, params, many, context):
+    # the last hook is the outermost one, as with nested execute_wrapper()
+    for hook in _hooks.get():
+        execute = partial(hook, execute)
+    return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_hooks(sender, connection, **kwargs):
+    # first, execute_wrapper() pops the last wrapper when its block ends
+    if run_hooks not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, run_hooks)
@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+from contextlib import closing
+from functools import partial
+
+POOL_DEFAULTS = {
+    'SIZE': 4,
+    'MAX_LIFETIME': 600,
+    'IDLE_TIMEOUT': 60,
+    'CHECK_AFTER': 1,
+    'TIMEOUT': 10,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """At most `size` DB-API connections shared by the threads of a process.
+
+    checkout() opens a new connection with connect() when none is idle.
+    A connection is closed instead of reused once it is older than
+    max_lifetime or was idle for more than idle_timeout seconds. One idle
+    for check_after seconds or more is checked with check() first.
+    """
+
+    def __init__(self, check, size, max_lifetime=None, idle_timeout=None,
+                 check_after=0, timeout=None):
+        self.check = check
+        self.size = size
+        self.max_lifetime = max_lifetime
+        self.idle_timeout = idle_timeout
+        self.check_after = check_after
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        # (connection, returned at), the most recently returned last
+        self._idle = []
+        self._opened = {}
+
+    def expired(self, connection, now):
+        return (self.max_lifetime is not None and
+                now - self._opened[id(connection)] >= self.max_lifetime)
+
+    def discard(self, connection):
+        with self._lock:
+            self._opened.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def checkout(self, connect):
+        """Return (connection, whether it was opened just now)."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(
+                f'No free database connection in {self.timeout} s, '
+                f'all {self.size} are in use'
+            )
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    connection, returned = self._idle.pop()
+                now = time.monotonic()
+                if (self.expired(connection, now) or
+                        self.idle_timeout is not None and
+                        now - returned > self.idle_timeout or
+                        now - returned >= self.check_after and
+                        not self.check(connection)):
+                    self.discard(connection)
+                    continue
+                return connection, False
+            connection = connect()
+            with self._lock:
+                self._opened[id(connection)] = time.monotonic()
+            return connection, True
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def checkin(self, connection, broken=False):
+        try:
+            now = time.monotonic()
+            if broken or self.expired(connection, now):
+                self.discard(connection)
+                return
+            with self._lock:
+                self._idle.append((connection, now))
+                stale = []
+                # the least recently returned come first
+                while self.idle_timeout is not None and (
+                        now - self._idle[0][1] > self.idle_timeout):
+                    stale.append(self._idle.pop(0)[0])
+            for connection in stale:
+                self.discard(connection)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _returned in idle:
+            self.discard(connection)
+
+
+def get_pool(alias, settings_dict, check):
+    # a pool inherited from a preloading gunicorn master is not reused, its
+    # connections belong to the master; test database setup connects the
+    # same alias to another database
+    key = (os.getpid(), alias) + tuple(
+        settings_dict[name] for name in ('NAME', 'USER', 'HOST', 'PORT')
+    )
+    with _pools_lock:
+        if key not in _pools:
+            options = {**POOL_DEFAULTS, **settings_dict.get('POOL', {})}
+            _pools[key] = ConnectionPool(
+                check, options['SIZE'],
+                max_lifetime=options['MAX_LIFETIME'],
+                idle_timeout=options['IDLE_TIMEOUT'],
+                check_after=options['CHECK_AFTER'],
+                timeout=options['TIMEOUT'],
+            )
+        return _pools[key]
+
+
+def close_pools():
+    with _pools_lock:
+        pools = [pool for key, pool in _pools.items()
+                 if key[0] == os.getpid()]
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+class PooledDatabaseWrapperMixin:
+    """DatabaseWrapper taking its connections from a per-process pool.
+
+    Configured by DATABASES[alias]['POOL'], see POOL_DEFAULTS. close()
+    hands the connection back to the pool, so CONN_MAX_AGE should be 0:
+    Django then returns it at the end of every request.
+    """
+    connection_reused = False
+
+    def get_pool(self):
+        return get_pool(self.alias, self.settings_dict, self.check_connection)
+
+    def check_connection(self, connection):
+        try:
+            with closing(connection.cursor()) as cursor:
+                cursor.execute('SELECT 1')
+            return True
+        except self.Database.Error:
+            return False
+
+    def get_new_connection(self, conn_params):
+        try:
+            connection, opened = self.get_pool().checkout(
+                partial(super().get_new_connection, conn_params)
+            )
+        except PoolTimeout as error:
+            raise self.Database.OperationalError(str(error)) from error
+        self.connection_reused = not opened
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # a connection closed inside a transaction or after an error that
+        # broke it must not be handed to the next request
+        broken = (
+            self.in_atomic_block
+            or self.get_autocommit() != self.settings_dict['AUTOCOMMIT']
+            or self.errors_occurred
+            and not self.check_connection(self.connection)
+        )
+        self.get_pool().checkin(self.connection, broken=broken)
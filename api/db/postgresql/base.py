@@ -0,0 +1,17 @@
+from django.db.backends.postgresql import base
+from psycopg2.extensions import ISOLATION_LEVEL_READ_COMMITTED
+
+from ..pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        if self.connection_reused:
+            # set by the wrapper that opened the connection, reading it
+            # back from a connection in autocommit mode is not possible
+            self.isolation_level = self.settings_dict['OPTIONS'].get(
+                'isolation_level', ISOLATION_LEVEL_READ_COMMITTED
+            )
+        return connection
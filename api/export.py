@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import Comment, Review, Title
+from .serializers import CommentSerializer, ReviewSerializer, TitlesSerializer
+
+CHUNK_SIZE = 2000
+
+
+def chunks(rows, size):
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_titles(chunk_size=CHUNK_SIZE):
+    """TitlesSerializer layout built from values() rows."""
+    rating = TitlesSerializer().fields['rating']
+    rows = Title.objects.order_by('id').values_list(
+        'id', 'name', 'year', 'rating_sum', 'rating_count', 'description',
+        'category__name', 'category__slug',
+    ).iterator(chunk_size=chunk_size)
+    for chunk in chunks(rows, chunk_size):
+        genres = {}
+        for title_id, name, slug in Title.genre.through.objects.filter(
+                title_id__in=[row[0] for row in chunk]
+        ).values_list('title_id', 'genre__name', 'genre__slug'):
+            genres.setdefault(title_id, []).append(
+                {'name': name, 'slug': slug}
+            )
+        for (pk, name, year, rating_sum, rating_count, description,
+             category_name, category_slug) in chunk:
+            yield {
+                'id': pk,
+                'name': name,
+                'year': year,
+                'rating': rating.to_representation(
+                    rating_sum / rating_count
+                ) if rating_count else None,
+                'description': description,
+                'genre': genres.get(pk, []),
+                'category': {
+                    'name': category_name, 'slug': category_slug
+                } if category_slug is not None else None,
+            }
+
+
+def iter_reviews(chunk_size=CHUNK_SIZE):
+    """ReviewSerializer layout with the nested title replaced by its id."""
+    pub_date = ReviewSerializer().fields['pub_date']
+    rows = Review.objects.order_by('id').values_list(
+        'id', 'author__username', 'title_id', 'score', 'text', 'pub_date'
+    ).iterator(chunk_size=chunk_size)
+    for pk, author, title, score, text, published in rows:
+        yield {
+            'id': pk,
+            'author': author,
+            'title': title,
+            'score': score,
+            'text': text,
+            'pub_date': pub_date.to_representation(published),
+        }
+
+
+def iter_comments(chunk_size=CHUNK_SIZE):
+    """CommentSerializer layout plus the review id."""
+    pub_date = CommentSerializer().fields['pub_date']
+    rows = Comment.objects.order_by('id').values_list(
+        'id', 'review_id', 'text', 'author__username', 'pub_date'
+    ).iterator(chunk_size=chunk_size)
+    for pk, review, text, author, published in rows:
+        yield {
+            'id': pk,
+            'review': review,
+            'text': text,
+            'author': author,
+            'pub_date': pub_date.to_representation(published),
+        }
+
+
+DATASETS = {
+    'titles': iter_titles,
+    'reviews': iter_reviews,
+    'comments': iter_comments,
+}
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=JSONEncoder, ensure_ascii=False) + '\n'
+
+
+def flatten(value):
+    if isinstance(value, dict):
+        return value['slug']
+    if isinstance(value, list):
+        return ','.join(item['slug'] for item in value)
+    return value
+
+
+def csv_lines(rows):
+    buffer = io.StringIO()
+    writer = None
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row))
+            writer.writeheader()
+        writer.writerow({key: flatten(value) for key, value in row.items()})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+FORMATS = {
+    'ndjson': (ndjson_lines, 'application/x-ndjson'),
+    'csv': (csv_lines, 'text/csv'),
+}
+
+
+def export_lines(dataset, output='ndjson', chunk_size=CHUNK_SIZE):
+    lines, _ = FORMATS[output]
+    return lines(DATASETS[dataset](chunk_size=chunk_size))
@@ -0,0 +1,222 @@
+"""Read-only fast path of TitlesSerializer, ReviewSerializer and
+CommentSerializer.
+
+A ValuesSerializer builds the response dicts of a whole page from
+.values() rows, without model instances or serializer fields. The output
+is that of the serializer it stands for, tests/test_fastpath.py compares
+the rendered bytes of both. Columns and lookups of fields left out by
+context['fieldset'] (see api.fieldsets) are skipped.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from rest_framework.fields import DateTimeField
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+
+from .fieldsets import Fieldset
+from .models import Genre
+from .serializers import TitlesSerializer
+from .timing import timer
+
+CENTS = Decimal('0.01')
+
+# formats like the pub_date fields of the serializers
+DATETIME = DateTimeField()
+
+
+def title_rating(rating_sum, rating_count):
+    """TitlesSerializer rating: RoundingDecimalField as the encoder renders it.
+
+    The float goes through Decimal(str()) as the field does, round()
+    would round 2.675 down.
+    """
+    if not rating_count:
+        return None
+    return float(Decimal(str(rating_sum / rating_count)).quantize(CENTS))
+
+
+def title_genres(title_ids, expand=True):
+    """{title id: [genre dicts or slugs]}, in the order prefetch_related
+    gives.
+    """
+    genres = {}
+    for title_id, name, slug in Genre.objects.filter(
+            genre__in=title_ids
+    ).values_list('genre', 'name', 'slug'):
+        genres.setdefault(title_id, []).append(
+            {'name': name, 'slug': slug} if expand else slug
+        )
+    return genres
+
+
+def title_category(row, expand=True):
+    slug = row.get('category__slug')
+    if slug is None or not expand:
+        return slug
+    return {'name': row['category__name'], 'slug': slug}
+
+
+class ValuesSerializer:
+    """Serializer of .values() rows, get_values() are the columns fetched."""
+    values = ()
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.fieldset = self.context.get('fieldset') or Fieldset()
+
+    def get_values(self):
+        return list(self.values)
+
+    def get_queryset(self, queryset):
+        return queryset.select_related(None).prefetch_related(None).values(
+            *self.get_values()
+        )
+
+    def to_representation(self, rows):
+        """Response dicts of a list of rows."""
+        raise NotImplementedError
+
+
+class TitleValuesSerializer(ValuesSerializer):
+    # genres are looked up by id
+    values = ('id',)
+
+    def get_values(self):
+        fieldset = self.fieldset
+        values = super().get_values() + [
+            name for name in ('name', 'year', 'description')
+            if fieldset.includes(name)
+        ]
+        if fieldset.includes('rating'):
+            values += ['rating_sum', 'rating_count']
+        if fieldset.includes('category'):
+            values.append('category__slug')
+            if fieldset.expands('category'):
+                values.append('category__name')
+        return values
+
+    def to_representation(self, rows):
+        fieldset = self.fieldset
+        genres = title_genres(
+            [row['id'] for row in rows], fieldset.expands('genre')
+        ) if fieldset.includes('genre') else {}
+        expand_category = fieldset.expands('category')
+        return [fieldset.pick({
+            'id': row['id'],
+            'name': row.get('name'),
+            'year': row.get('year'),
+            'rating': title_rating(row.get('rating_sum'),
+                                   row.get('rating_count')),
+            'description': row.get('description'),
+            'genre': genres.get(row['id'], []),
+            'category': title_category(row, expand_category),
+        }) for row in rows]
+
+
+class ReviewValuesSerializer(ValuesSerializer):
+    """Reviews of context['title'], which is serialized once per page."""
+    # cursor pages take their position from pub_date
+    values = ('id', 'pub_date')
+
+    def get_values(self):
+        fieldset = self.fieldset
+        values = super().get_values() + [
+            name for name in ('score', 'text') if fieldset.includes(name)
+        ]
+        if fieldset.includes('author'):
+            values.append('author__username')
+        return values
+
+    def to_representation(self, rows):
+        fieldset = self.fieldset
+        title = self.context['title']
+        if not fieldset.includes('title'):
+            title = None
+        elif fieldset.expands('title'):
+            title = TitlesSerializer(title).data
+        else:
+            title = title.pk
+        return [fieldset.pick({
+            'id': row['id'],
+            'author': row.get('author__username'),
+            'title': title,
+            'score': row.get('score'),
+            'text': row.get('text'),
+            'pub_date': DATETIME.to_representation(row['pub_date']),
+        }) for row in rows]
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    values = ('id', 'pub_date')
+
+    def get_values(self):
+        values = super().get_values()
+        if self.fieldset.includes('text'):
+            values.append('text')
+        if self.fieldset.includes('author'):
+            values.append('author__username')
+        return values
+
+    def to_representation(self, rows):
+        return [self.fieldset.pick({
+            'id': row['id'],
+            'text': row.get('text'),
+            'author': row.get('author__username'),
+            'pub_date': DATETIME.to_representation(row['pub_date']),
+        }) for row in rows]
+
+
+class ValuesReadMixin:
+    """Answer values_actions with values_serializer_class.
+
+    Turned off with FAST_READ_SERIALIZERS = False, writes always use
+    serializer_class.
+    """
+    values_serializer_class = None
+    values_actions = ('list',)
+
+    def use_values(self):
+        return (self.action in self.values_actions
+                and getattr(settings, 'FAST_READ_SERIALIZERS', True))
+
+    def get_values_serializer(self):
+        return self.values_serializer_class(
+            context=self.get_serializer_context()
+        )
+
+    def get_values_queryset(self, serializer):
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = serializer.get_queryset(queryset)
+        # the paginator counts without the joins the values add
+        rows.count = queryset.count
+        return rows
+
+    def represent(self, serializer, rows):
+        with timer('serialize'):
+            return serializer.to_representation(rows)
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_values():
+            return super().list(request, *args, **kwargs)
+        serializer = self.get_values_serializer()
+        queryset = self.get_values_queryset(serializer)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                self.represent(serializer, page)
+            )
+        return Response(self.represent(serializer, list(queryset)))
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.use_values():
+            return super().retrieve(request, *args, **kwargs)
+        serializer = self.get_values_serializer()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            self.get_values_queryset(serializer),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        # the permissions of these views look at the object for writes only
+        self.check_object_permissions(request, row)
+        return Response(self.represent(serializer, [row])[0])
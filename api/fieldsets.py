@@ -0,0 +1,113 @@
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def split(value):
+    return [name for name in value.split(',') if name] if value else []
+
+
+class Fieldset:
+    """Fields of a response asked for with ?fields=, nested objects
+    with ?expand=.
+
+    Without both parameters every field is there and nested objects are
+    expanded, as before. With either one, a nested object left out of
+    ?expand= is a reference: the id of a title, the slugs of a category
+    and of genres.
+    """
+
+    def __init__(self, fields=None, expand=None):
+        self.fields = fields
+        self.expand = expand
+
+    @classmethod
+    def from_request(cls, request, fields, expandable=()):
+        params = request.query_params
+        if FIELDS_PARAM not in params and EXPAND_PARAM not in params:
+            return cls()
+        requested = split(params.get(FIELDS_PARAM))
+        expand = split(params.get(EXPAND_PARAM))
+        errors = {}
+        for param, names, allowed in ((FIELDS_PARAM, requested, fields),
+                                      (EXPAND_PARAM, expand, expandable)):
+            unknown = [name for name in names if name not in allowed]
+            if unknown:
+                errors[param] = [
+                    f'Unknown fields: {", ".join(unknown)}. '
+                    f'Expected some of: {", ".join(allowed)}.'
+                ]
+        if errors:
+            raise ValidationError(errors)
+        return cls(
+            # in the order of the full response
+            tuple(name for name in fields if name in requested)
+            if requested else None,
+            frozenset(expand),
+        )
+
+    @property
+    def sparse(self):
+        return self.fields is not None or self.expand is not None
+
+    def includes(self, name):
+        return self.fields is None or name in self.fields
+
+    def expands(self, name):
+        return self.expand is None or name in self.expand
+
+    def pick(self, data):
+        """data with the requested fields only."""
+        if self.fields is None:
+            return data
+        return {name: data[name] for name in self.fields}
+
+
+class FieldsetMixin:
+    """Pass the Fieldset of ?fields= and ?expand= of fieldset_actions to
+    the serializers as context['fieldset'].
+
+    fieldset_fields are the fields of the full response, in its order,
+    expandable_fields the nested objects among them.
+    """
+    fieldset_actions = ('list', 'retrieve')
+    fieldset_fields = ()
+    expandable_fields = ()
+
+    def get_fieldset(self):
+        if not hasattr(self, '_fieldset'):
+            if self.action in self.fieldset_actions:
+                self._fieldset = Fieldset.from_request(
+                    self.request, self.fieldset_fields,
+                    self.expandable_fields,
+                )
+            else:
+                self._fieldset = Fieldset()
+        return self._fieldset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fieldset'] = self.get_fieldset()
+        return context
+
+
+class SparseFieldsMixin:
+    """Serializer answering context['fieldset'].
+
+    reference_fields build the field a nested object is replaced with
+    when it is not expanded.
+    """
+    reference_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fieldset = self.context.get('fieldset')
+        if fieldset is None or not fieldset.sparse:
+            return
+        for name in list(self.fields):
+            if not fieldset.includes(name):
+                self.fields.pop(name)
+            elif (name in self.reference_fields
+                  and not fieldset.expands(name)):
+                self.fields[name] = self.reference_fields[name]()
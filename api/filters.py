@@ -1,3 +1,8 @@
+from django.db import connections
+from django.db.models import (
+    BooleanField, Case, FloatField, Func, IntegerField, Q, Value, When
+)
+from django.db.models.functions import Upper
 from django_filters import rest_framework as filters
 from .models import Title
 
@@ -6,12 +11,43 @@ class CharFilterInFilter(filters.BaseInFilter, filters.CharFilter):
     pass
 
 
+class TrigramMatch(Func):
+    """pg_trgm `%` operator, served by the UPPER(name) gin_trgm_ops index."""
+    arg_joiner = ' %% '
+    template = '(%(expressions)s)'
+    output_field = BooleanField()
+
+
+class TrigramSimilarity(Func):
+    function = 'SIMILARITY'
+    output_field = FloatField()
+
+
+def search_titles(queryset, name, value):
+    if connections[queryset.db].vendor == 'postgresql':
+        text, query = Upper('name'), Upper(Value(value))
+        return queryset.filter(
+            Q(name__icontains=value) | Q(TrigramMatch(text, query))
+        ).annotate(
+            search_rank=TrigramSimilarity(text, query)
+        ).order_by('-search_rank', 'id')
+    return queryset.filter(name__icontains=value).annotate(
+        search_rank=Case(
+            When(name__iexact=value, then=Value(2)),
+            When(name__istartswith=value, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    ).order_by('-search_rank', 'id')
+
+
 class TitleFilter(filters.FilterSet):
     name = filters.CharFilter(field_name='name', lookup_expr='icontains')
     year = filters.NumberFilter()
     category = filters.CharFilter(field_name='category__slug', lookup_expr='exact')
     genre = CharFilterInFilter(field_name='genre__slug', lookup_expr='in')
+    search = filters.CharFilter(method=search_titles)
 
     class Meta:
         models = Title
-        fields = ['category', 'year', 'name', 'genre']
+        fields = ['category', 'year', 'name', 'genre', 'search']
@@ -0,0 +1,115 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from .cache import invalidate
+from .models import Review, Title, TitleScore
+
+BOARDS = ('top', 'trending')
+
+# ids per IN (...) clause and rows per INSERT
+BATCH_SIZE = 500
+
+
+def half_life():
+    return timedelta(seconds=getattr(
+        settings, 'LEADERBOARD_TRENDING_HALF_LIFE', 3 * 24 * 60 * 60
+    ))
+
+
+def window():
+    return timedelta(seconds=getattr(
+        settings, 'LEADERBOARD_TRENDING_WINDOW', 30 * 24 * 60 * 60
+    ))
+
+
+def decay(moment, reference):
+    """Weight of a review published at moment, as of reference."""
+    return 2 ** ((moment - reference) / half_life())
+
+
+def batches(items):
+    for start in range(0, len(items), BATCH_SIZE):
+        yield items[start:start + BATCH_SIZE]
+
+
+def trending_scores(title_ids, reference):
+    """Sum of review scores of the titles, each decayed to reference.
+
+    Reviews older than the window weigh almost nothing and are skipped.
+    """
+    scores = defaultdict(float)
+    for ids in batches(title_ids):
+        reviews = Review.objects.filter(
+            title_id__in=ids, score__isnull=False,
+            pub_date__gte=reference - window(),
+        ).order_by().values_list('title_id', 'score', 'pub_date')
+        for title_id, score, pub_date in reviews.iterator():
+            scores[title_id] += score * decay(pub_date, reference)
+    return scores
+
+
+def refresh(full=False, now=None):
+    """Bring TitleScore up to date, return the number of rebuilt rows.
+
+    Only titles whose version moved since their row was computed are
+    rebuilt, every review change bumps the version of its title. Rows keep
+    the reference of the last full rebuild, which happens when asked for
+    or once the reference is older than the trending window.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        reference = TitleScore.objects.aggregate(
+            reference=Max('reference')
+        )['reference']
+        titles = Title.objects.order_by()
+        if full or reference is None or now - reference > window():
+            reference = now
+            TitleScore.objects.all().delete()
+        else:
+            titles = titles.exclude(leaderboard__version=F('version'))
+        titles = list(titles.values_list(
+            'id', 'category_id', 'version', 'rating_sum', 'rating_count'
+        ))
+        title_ids = [title[0] for title in titles]
+        trending = trending_scores(title_ids, reference)
+        for ids in batches(title_ids):
+            TitleScore.objects.filter(pk__in=ids).delete()
+        TitleScore.objects.bulk_create([
+            TitleScore(
+                title_id=pk, category_id=category_id, version=version,
+                rating=rating_sum / rating_count if rating_count else None,
+                rating_count=rating_count, trending=trending.get(pk, 0),
+                reference=reference,
+            )
+            for pk, category_id, version, rating_sum, rating_count in titles
+        ], batch_size=BATCH_SIZE)
+    if titles:
+        invalidate('leaderboards')
+    return len(titles)
+
+
+def leaderboard(board, category=None, genre=None, min_reviews=1):
+    """TitleScore rows of the board, best first."""
+    scores = TitleScore.objects.select_related(
+        'title__category'
+    ).prefetch_related('title__genre')
+    if category is not None:
+        scores = scores.filter(category__slug=category)
+    if genre is not None:
+        scores = scores.filter(title__genre__slug=genre)
+    if board == 'top':
+        return scores.filter(
+            rating_count__gte=max(min_reviews, 1)
+        ).order_by('-rating', '-rating_count', 'title_id')
+    return scores.filter(trending__gt=0).order_by('-trending', 'title_id')
+
+
+def trending_now(score, now=None):
+    """Trending score of a row decayed from its reference to now."""
+    return score.trending * decay(reference=now or timezone.now(),
+                                  moment=score.reference)
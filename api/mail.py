@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def queue_email(subject, body, to):
+    """Store the message for send_queued_email, nothing is sent here."""
+    return OutgoingEmail.objects.create(subject=subject, body=body, to=to)
+
+
+def max_attempts():
+    return getattr(settings, 'EMAIL_QUEUE_MAX_ATTEMPTS', 5)
+
+
+def backoff(attempts):
+    """Delay before the next try: 1, 2, 4 ... minutes, at most a day."""
+    base = getattr(settings, 'EMAIL_QUEUE_BACKOFF_SECONDS', 60)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 24 * 3600))
+
+
+def pending(now):
+    return OutgoingEmail.objects.filter(
+        sent_at__isnull=True, send_after__lte=now,
+        attempts__lt=max_attempts(),
+    )
+
+
+def deliver_pending(batch_size=100):
+    """Send one batch over a single SMTP connection.
+
+    Rows are locked with SKIP LOCKED where the database supports it, so
+    several workers do not send the same message. Returns the number of
+    (sent, failed) messages.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(pending(now).select_for_update(skip_locked=True)[
+            :batch_size
+        ])
+        if not batch:
+            return 0, 0
+        sent, failed = [], []
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as error:
+            failed = [(email, error) for email in batch]
+        else:
+            try:
+                for email in batch:
+                    message = EmailMessage(email.subject, email.body,
+                                           to=[email.to],
+                                           connection=connection)
+                    try:
+                        connection.send_messages([message])
+                    except Exception as error:
+                        failed.append((email, error))
+                    else:
+                        sent.append(email.pk)
+            finally:
+                connection.close()
+        OutgoingEmail.objects.filter(pk__in=sent).update(
+            sent_at=timezone.now(), attempts=F('attempts') + 1,
+            last_error='',
+        )
+        for email, error in failed:
+            email.attempts += 1
+            email.send_after = now + backoff(email.attempts)
+            email.last_error = repr(error)
+            email.save(update_fields=['attempts', 'send_after', 'last_error'])
+    return len(sent), len(failed)
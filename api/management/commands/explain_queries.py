@@ -0,0 +1,90 @@
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import invalidate
+from api.datagen import add_size_arguments, generate, generate_options
+from api.models import Category, Genre, Title
+
+
+def endpoints():
+    title = Title.objects.annotate(
+        reviews_count=Count('reviews')
+    ).order_by('-reviews_count', 'id').first()
+    review = title.reviews.annotate(
+        comments_count=Count('comments')
+    ).order_by('-comments_count', 'id').first()
+    last_page = max(title.reviews_count - 1, 0) // settings.REST_FRAMEWORK[
+        'PAGE_SIZE'
+    ] + 1
+    genre = Genre.objects.first()
+    category = Category.objects.first()
+    filters = urlencode({
+        'category': category.slug, 'genre': genre.slug, 'year': 2000
+    })
+    return (
+        ('titles list', '/api/v1/titles/'),
+        ('titles filtered', f'/api/v1/titles/?{filters}'),
+        ('titles search', '/api/v1/titles/?search=title+1'),
+        ('title detail', f'/api/v1/titles/{title.id}/'),
+        ('reviews list', f'/api/v1/titles/{title.id}/reviews/'),
+        ('reviews last page',
+         f'/api/v1/titles/{title.id}/reviews/?page={last_page}'),
+        ('reviews cursor',
+         f'/api/v1/titles/{title.id}/reviews/?pagination=cursor'),
+        ('review detail', f'/api/v1/titles/{title.id}/reviews/{review.id}/'),
+        ('comments list',
+         f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'),
+        ('genres list', '/api/v1/genres/'),
+        ('genres search',
+         f'/api/v1/genres/?{urlencode({"search": genre.name})}'),
+        ('categories list', '/api/v1/categories/'),
+    )
+
+
+class Command(BaseCommand):
+    help = ('Print the query plans of every read endpoint, on generated '
+            'data that is rolled back afterwards')
+
+    def add_arguments(self, parser):
+        add_size_arguments(parser)
+        parser.add_argument(
+            '--existing', action='store_true',
+            help='Explain against the data already in the database'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if not options['existing']:
+                generate(**generate_options(options))
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            client = Client()
+            for name, url in endpoints():
+                invalidate('titles', 'genres', 'categories')
+                with CaptureQueriesContext(connection) as context:
+                    status = client.get(url).status_code
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f'{name}: GET {url} -> {status}, '
+                    f'{len(context.captured_queries)} queries'
+                ))
+                for query in context.captured_queries:
+                    if query['sql'].lstrip().upper().startswith('SELECT'):
+                        self.explain(query['sql'])
+            transaction.set_rollback(True)
+
+    def explain(self, sql):
+        if connection.vendor == 'postgresql':
+            prefix = 'EXPLAIN (ANALYZE, BUFFERS) '
+        else:
+            prefix = 'EXPLAIN QUERY PLAN '
+        self.stdout.write(sql)
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql)
+            for row in cursor.fetchall():
+                self.stdout.write('    ' + ' '.join(str(col) for col in row))
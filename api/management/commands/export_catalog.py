@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from api.export import CHUNK_SIZE, DATASETS, FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = 'Stream titles, reviews or comments as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(DATASETS))
+        parser.add_argument(
+            '--output', choices=sorted(FORMATS), default='ndjson'
+        )
+        parser.add_argument(
+            '--file', help='Write to this file instead of stdout'
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        lines = export_lines(
+            options['dataset'], options['output'], options['chunk_size']
+        )
+        if options['file']:
+            with open(options['file'], 'w', encoding='utf-8',
+                      newline='') as target:
+                target.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
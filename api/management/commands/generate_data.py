@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.datagen import add_size_arguments, generate, generate_options
+from api.models import Comment, Review
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with a seeded, skewed synthetic catalog'
+
+    def add_arguments(self, parser):
+        add_size_arguments(parser)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        with transaction.atomic():
+            title_ids = generate(**generate_options(options))
+        hottest = title_ids[0] if title_ids else None
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {len(title_ids)} titles, '
+            f'{Review.objects.count()} reviews, '
+            f'{Comment.objects.count()} comments in '
+            f'{time.monotonic() - started:.1f}s; most reviewed title: '
+            f'{hottest}'
+        ))
@@ -0,0 +1,216 @@
+import csv
+import io
+import os
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from api.cache import invalidate
+from api.models import Category, Comment, Genre, Review, Title
+
+from .rebuild_ratings import rebuild_ratings
+
+User = get_user_model()
+
+# (file name, model, {csv column: model field attname}) in dependency order
+SOURCES = (
+    ('users.csv', User, {
+        'id': 'id', 'username': 'username', 'email': 'email',
+        'role': 'role', 'description': 'bio',
+        'first_name': 'first_name', 'last_name': 'last_name',
+    }),
+    ('category.csv', Category, {'id': 'id', 'name': 'name', 'slug': 'slug'}),
+    ('genre.csv', Genre, {'id': 'id', 'name': 'name', 'slug': 'slug'}),
+    ('titles.csv', Title, {
+        'id': 'id', 'name': 'name', 'year': 'year',
+        'category': 'category_id',
+    }),
+    ('genre_title.csv', Title.genre.through, {
+        'id': 'id', 'title_id': 'title_id', 'genre_id': 'genre_id',
+    }),
+    ('review.csv', Review, {
+        'id': 'id', 'title_id': 'title_id', 'text': 'text',
+        'author': 'author_id', 'score': 'score', 'pub_date': 'pub_date',
+    }),
+    ('comments.csv', Comment, {
+        'id': 'id', 'review_id': 'review_id', 'text': 'text',
+        'author': 'author_id', 'pub_date': 'pub_date',
+    }),
+)
+
+
+class IteratorFile(io.TextIOBase):
+    """Read-only file over an iterator of strings, fed to COPY."""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.buffer = ''
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            try:
+                self.buffer += next(self.lines)
+            except StopIteration:
+                break
+        if size < 0:
+            size = len(self.buffer)
+        chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """Let bulk_create store pub_date values taken from the file."""
+    fields = [field for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = 'Load data/*.csv into the database with bulk inserts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=os.path.join(settings.BASE_DIR, 'data'),
+            help='Directory with the csv files'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument(
+            '--copy', action='store_true',
+            help='Use COPY FROM STDIN when the database is PostgreSQL'
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        use_copy = options['copy'] and connection.vendor == 'postgresql'
+        if options['copy'] and not use_copy:
+            self.stderr.write(
+                f'COPY is not available on {connection.vendor}, '
+                f'falling back to bulk_create'
+            )
+        models = []
+        with transaction.atomic(using=options['database']):
+            for filename, model, columns in SOURCES:
+                path = os.path.join(options['path'], filename)
+                if not os.path.exists(path):
+                    self.stdout.write(f'{filename}: skipped, no file')
+                    continue
+                started = time.monotonic()
+                with open(path, encoding='utf-8', newline='') as source:
+                    objects = self.read(source, model, columns)
+                    if use_copy:
+                        read, inserted = self.copy(connection, model, objects)
+                    else:
+                        read, inserted = self.bulk_create(
+                            model, objects, options['batch_size'],
+                            options['database']
+                        )
+                elapsed = time.monotonic() - started
+                models.append(model)
+                self.stdout.write(
+                    f'{filename}: {inserted} of {read} rows in '
+                    f'{elapsed:.2f}s ({read / max(elapsed, 1e-6):.0f} '
+                    f'rows/sec)'
+                )
+            self.reset_sequences(connection, models)
+            rebuild_ratings()
+        invalidate('titles', 'genres', 'categories')
+        self.stdout.write(self.style.SUCCESS('Import finished'))
+
+    def read(self, source, model, columns):
+        reader = csv.DictReader(source)
+        missing = set(columns) - set(reader.fieldnames or ())
+        if missing:
+            raise CommandError(
+                f'{source.name}: missing columns {", ".join(sorted(missing))}'
+            )
+        fields = {field.attname: field
+                  for field in model._meta.concrete_fields}
+        for row in reader:
+            values = {}
+            for column, attname in columns.items():
+                value = row[column]
+                field = fields[attname]
+                if value == '' and field.null:
+                    value = None
+                values[attname] = field.to_python(value)
+            obj = model(**values)
+            if model is User:
+                obj.set_unusable_password()
+            yield obj
+
+    def bulk_create(self, model, objects, batch_size, using):
+        # rows breaking a unique constraint (data/review.csv has a few
+        # second reviews of the same author) are skipped
+        manager = model.objects.using(using)
+        before = manager.count()
+        read = 0
+        with keep_auto_now_add(model):
+            while True:
+                batch = list(islice(objects, batch_size))
+                if not batch:
+                    break
+                manager.bulk_create(batch, ignore_conflicts=True)
+                read += len(batch)
+        return read, manager.count() - before
+
+    def copy(self, connection, model, objects):
+        fields = model._meta.concrete_fields
+        counter = {'rows': 0}
+
+        def lines():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+            for obj in objects:
+                writer.writerow([
+                    field.get_db_prep_save(getattr(obj, field.attname),
+                                           connection)
+                    for field in fields
+                ])
+                counter['rows'] += 1
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        quote = connection.ops.quote_name
+        table = quote(model._meta.db_table)
+        staging = quote(f'import_{model._meta.db_table}')
+        columns = ', '.join(quote(field.column) for field in fields)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE {staging} '
+                f'(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP'
+            )
+            cursor.cursor.copy_expert(
+                f'COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv)',
+                IteratorFile(lines())
+            )
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) '
+                f'SELECT {columns} FROM {staging} ON CONFLICT DO NOTHING'
+            )
+            inserted = cursor.rowcount
+        return counter['rows'], inserted
+
+    def reset_sequences(self, connection, models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
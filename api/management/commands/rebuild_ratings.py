@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import (
+    Count, F, IntegerField, OuterRef, Subquery, Sum,
+)
+from django.db.models.functions import Coalesce
+
+from api.cache import invalidate_on_commit
+from api.models import Review, Title
+
+
+def rebuild_ratings():
+    """Recalculate the ratings, bumping the version of every title."""
+    scores = Review.objects.filter(
+        title=OuterRef('pk'), score__isnull=False
+    ).order_by().values('title')
+    updated = Title.objects.update(
+        rating_sum=Coalesce(
+            Subquery(scores.annotate(total=Sum('score')).values('total'),
+                     output_field=IntegerField()),
+            0
+        ),
+        rating_count=Coalesce(
+            Subquery(scores.annotate(total=Count('score')).values('total'),
+                     output_field=IntegerField()),
+            0
+        ),
+        # the ETags, cached responses and leaderboard rows of the titles
+        version=F('version') + 1,
+    )
+    invalidate_on_commit('titles', 'leaderboards')
+    return updated
+
+
+class Command(BaseCommand):
+    help = 'Recalculate Title.rating_sum and Title.rating_count from reviews'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = rebuild_ratings()
+        self.stdout.write(self.style.SUCCESS(
+            f'Ratings rebuilt for {updated} titles'
+        ))
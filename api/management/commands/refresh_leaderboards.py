@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.leaderboards import refresh
+
+
+class Command(BaseCommand):
+    help = 'Rebuild leaderboard rows of titles changed since the last run'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Rebuild every row and move the trending reference to now'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Keep running, refreshing every this many seconds'
+        )
+
+    def handle(self, *args, **options):
+        full = options['full']
+        while True:
+            rebuilt = refresh(full=full)
+            self.stdout.write(f'{rebuilt} leaderboard rows rebuilt')
+            if options['interval'] is None:
+                return
+            full = False
+            time.sleep(options['interval'])
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import time
+from functools import partial
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+    generate_latest, multiprocess,
+)
+
+from .db.hooks import query_hooks
+
+# with prometheus_multiproc_dir set every gunicorn worker writes its
+# values to mmap files in that directory and /metrics sums them up
+MULTIPROC_DIR_ENV = 'prometheus_multiproc_dir'
+
+REQUESTS = Counter(
+    'yamdb_http_requests_total', 'Finished HTTP requests',
+    ['route', 'method', 'status'],
+)
+LATENCY = Histogram(
+    'yamdb_http_request_duration_seconds', 'Request latency',
+    ['route', 'method'],
+    buckets=(.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10),
+)
+QUERIES = Histogram(
+    'yamdb_db_queries_per_request', 'SQL queries run by one request',
+    ['route'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200),
+)
+CACHE = Counter(
+    'yamdb_catalog_cache_requests_total', 'Catalog cache lookups',
+    ['result'],
+)
+CONNECTIONS = Counter(
+    'yamdb_db_connections_opened_total', 'Database connections opened',
+    ['alias'],
+)
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    # a connection handed out again by api.db.pool was counted when opened
+    if not getattr(connection, 'connection_reused', False):
+        CONNECTIONS.labels(connection.alias).inc()
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.url_name or match.view_name or 'unnamed'
+
+
+def count_query(queries, execute, sql, params, many, context):
+    queries[0] += 1
+    return execute(sql, params, many, context)
+
+
+class PrometheusMiddleware:
+    """Count requests, their latency and SQL queries per url name.
+
+    Router url names are '<basename>-<action>', e.g. 'titles-list'.
+    """
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # what django checks to await the middleware, see MiddlewareMixin
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        queries = [0]
+        started = time.perf_counter()
+        with query_hooks(partial(count_query, queries)):
+            response = self.get_response(request)
+        self.observe(request, response, time.perf_counter() - started,
+                     queries[0])
+        return response
+
+    async def __acall__(self, request):
+        queries = [0]
+        started = time.perf_counter()
+        with query_hooks(partial(count_query, queries)):
+            response = await self.get_response(request)
+        self.observe(request, response, time.perf_counter() - started,
+                     queries[0])
+        return response
+
+    def observe(self, request, response, elapsed, queries):
+        route = route_name(request)
+        REQUESTS.labels(route, request.method, response.status_code).inc()
+        LATENCY.labels(route, request.method).observe(elapsed)
+        QUERIES.labels(route).observe(queries)
+        if response.has_header('X-Cache'):
+            CACHE.labels(response['X-Cache'].lower()).inc()
+
+
+def registry():
+    path = os.environ.get(MULTIPROC_DIR_ENV)
+    if not path:
+        return REGISTRY
+    collected = CollectorRegistry()
+    multiprocess.MultiProcessCollector(collected, path=path)
+    return collected
+
+
+def metrics_view(request):
+    return HttpResponse(generate_latest(registry()),
+                        content_type=CONTENT_TYPE_LATEST)
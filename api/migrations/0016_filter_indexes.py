@@ -0,0 +1,24 @@
+# Generated by Django 3.0.5 on 2026-10-18 19:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'year'], name='title_category_year_idx'),
+        ),
+        # the auto-created through table only has (title_id, genre_id),
+        # genre__slug__in filters walk it from the genre side
+        migrations.RunSQL(
+            'CREATE INDEX title_genre_genre_title_idx '
+            'ON api_title_genre (genre_id, title_id)',
+            'DROP INDEX title_genre_genre_title_idx',
+        ),
+    ]
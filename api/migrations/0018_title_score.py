@@ -0,0 +1,46 @@
+# Generated by Django 3.0.5 on 2026-10-18 20:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleScore',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='leaderboard', serialize=False, to='api.Title')),
+                ('version', models.PositiveIntegerField(verbose_name='Версия произведения на момент расчёта')),
+                ('rating', models.FloatField(blank=True, null=True)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('trending', models.FloatField(default=0)),
+                ('reference', models.DateTimeField()),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.Category')),
+            ],
+            options={
+                'verbose_name': 'title score',
+                'verbose_name_plural': 'title scores',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titlescore',
+            index=models.Index(fields=['-rating', '-rating_count'], name='score_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titlescore',
+            index=models.Index(fields=['category', '-rating', '-rating_count'], name='score_category_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titlescore',
+            index=models.Index(fields=['-trending'], name='score_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titlescore',
+            index=models.Index(fields=['category', '-trending'], name='score_category_trending_idx'),
+        ),
+    ]
@@ -1,7 +1,28 @@
 import datetime
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.conf import settings
+from django.utils import timezone
+
+
+class CounterFieldsMixin:
+    """Leave denormalized counters out of save() of a loaded instance.
+
+    Counters are changed with F() updates only, writing back the copy
+    loaded at the start of a request would lose concurrent increments.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (not self._state.adding and not args
+                and kwargs.get('update_fields') is None
+                and not kwargs.get('force_insert')):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
 
 
 class Category(models.Model):
@@ -25,7 +46,12 @@ class Genre(models.Model):
         return self.name
 
 
-class Title(models.Model):
+class TitleQuerySet(models.QuerySet):
+    def with_relations(self):
+        return self.select_related('category').prefetch_related('genre')
+
+
+class Title(CounterFieldsMixin, models.Model):
     name = models.CharField(
         max_length=140, verbose_name='Название фильма'
     )
@@ -43,12 +69,77 @@ class Title(models.Model):
     genre = models.ManyToManyField(
          Genre, default=None, related_name='genre', blank=True
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0, verbose_name='Сумма оценок'
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0, verbose_name='Количество оценок'
+    )
+    version = models.PositiveIntegerField(
+        default=0, verbose_name='Версия произведения и его отзывов'
+    )
+
+    counter_fields = ('rating_sum', 'rating_count', 'version')
+
+    objects = TitleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', 'year'],
+                         name='title_category_year_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+
+class TitleScore(models.Model):
+    """Leaderboard row of a title, rebuilt by api.leaderboards.refresh.
+
+    trending is the time-decayed sum of review scores as of reference,
+    the same moment for every row, so ordering by it needs no decay.
+    """
+    title = models.OneToOneField(
+        Title, on_delete=models.CASCADE, primary_key=True,
+        related_name='leaderboard'
+    )
+    category = models.ForeignKey(
+        Category, on_delete=models.SET_NULL, blank=True, null=True,
+        related_name='+'
+    )
+    version = models.PositiveIntegerField(
+        verbose_name='Версия произведения на момент расчёта'
+    )
+    rating = models.FloatField(null=True, blank=True)
+    rating_count = models.PositiveIntegerField(default=0)
+    trending = models.FloatField(default=0)
+    reference = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'title score'
+        verbose_name_plural = 'title scores'
+        indexes = [
+            models.Index(fields=['-rating', '-rating_count'],
+                         name='score_rating_idx'),
+            models.Index(fields=['category', '-rating', '-rating_count'],
+                         name='score_category_rating_idx'),
+            models.Index(fields=['-trending'],
+                         name='score_trending_idx'),
+            models.Index(fields=['category', '-trending'],
+                         name='score_category_trending_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.title_id}: {self.rating} / {self.trending}'
 
-class Review(models.Model):
+
+class Review(CounterFieldsMixin, models.Model):
     title = models.ForeignKey(
         Title, on_delete=models.CASCADE, related_name='reviews')
     text = models.TextField()
@@ -63,12 +154,27 @@ class Review(models.Model):
     )
     pub_date = models.DateTimeField('Дата публикации',
                                     auto_now_add=True)
+    comments_version = models.PositiveIntegerField(
+        default=0, verbose_name='Версия комментариев'
+    )
+
+    counter_fields = ('comments_version',)
 
     class Meta:
         verbose_name = 'review'
         verbose_name_plural = 'reviews'
         ordering = ['-pub_date']
         unique_together = ('title', 'author')
+        indexes = [
+            models.Index(fields=['title', '-pub_date', '-id'],
+                         name='review_title_pub_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Title.rating_sum/rating_count are updated from the post_save
+        # signal, keep them in the same transaction as the review itself.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
 
 
 class Comment(models.Model):
@@ -86,3 +192,31 @@ class Comment(models.Model):
         verbose_name = 'comment'
         verbose_name_plural = 'comments'
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(fields=['review', '-pub_date', '-id'],
+                         name='comment_review_pub_date_idx'),
+        ]
+
+
+class OutgoingEmail(models.Model):
+    """Message waiting for the send_queued_email worker."""
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    to = models.EmailField()
+    created = models.DateTimeField(auto_now_add=True)
+    send_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = 'outgoing email'
+        verbose_name_plural = 'outgoing emails'
+        ordering = ['send_after', 'id']
+        indexes = [
+            models.Index(fields=['sent_at', 'send_after'],
+                         name='email_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
@@ -1,5 +1,38 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 
 class NumberPagination(PageNumberPagination):
-    page_size = 5
\ No newline at end of file
+    page_size = 5
+
+
+class PubDateCursorPagination(CursorPagination):
+    ordering = ('-pub_date', '-id')
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """Page numbers by default, keyset pages on ?pagination=cursor.
+
+    Cursor pages skip the COUNT query and the OFFSET scan, the links they
+    return carry the cursor so clients only have to opt in once.
+    """
+    cursor_pagination_class = PubDateCursorPagination
+    mode_query_param = 'pagination'
+
+    def use_cursor(self, request):
+        cursor_param = self.cursor_pagination_class.cursor_query_param
+        return (request.query_params.get(self.mode_query_param) == 'cursor'
+                or cursor_param in request.query_params)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,134 @@
+import asyncio
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import LazyObject, empty
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+PIN_COOKIE = 'yamdb_primary'
+
+_reads = ContextVar('replica_reads', default=None)
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def pin_seconds():
+    return getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+
+
+def pin_cache():
+    # the catalog cache, api.cache depends on this module
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+
+def pin_key(user_id):
+    return f'replica:pin:{user_id}'
+
+
+def request_user(request):
+    """User of the request if already known, never authenticates."""
+    user = request.__dict__.get('user')
+    if isinstance(user, LazyObject) and user._wrapped is empty:
+        return None
+    return user
+
+
+class RequestReads:
+    """Where the reads of one request go.
+
+    GET and HEAD requests read from a replica, unless the client or the
+    user wrote something in the last REPLICA_PIN_SECONDS: such requests
+    carry the pin cookie, or find the pin of their user in the cache once
+    the user is authenticated.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.alias = None
+        if (request.method in SAFE_METHODS and replicas()
+                and PIN_COOKIE not in request.COOKIES):
+            self.alias = random.choice(replicas())
+        self.user_checked = False
+
+    def get_alias(self):
+        if self.alias is not None and not self.user_checked:
+            user = request_user(self.request)
+            if user is not None:
+                self.user_checked = True
+                if user.is_authenticated and pin_cache().get(
+                        pin_key(user.pk)):
+                    self.alias = None
+        return self.alias
+
+
+def replica_alias():
+    """Replica the current request reads from, None for the primary."""
+    reads = _reads.get()
+    if reads is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return None
+    return reads.get_alias()
+
+
+class ReplicaRouter:
+    """Send reads of safe requests to DATABASE_REPLICAS, the rest to
+    the primary. Reads outside ReplicaMiddleware use the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return replica_alias() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # every alias is the primary or a copy of it
+        return True
+
+
+class ReplicaMiddleware:
+    """Decide per request where reads go, pin the primary after writes."""
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # what django checks to await the middleware, see MiddlewareMixin
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = _reads.set(RequestReads(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _reads.reset(token)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            self.pin(request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = _reads.set(RequestReads(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _reads.reset(token)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            # the pin goes to the cache, which may be a network round trip
+            await sync_to_async(self.pin)(request, response)
+        return response
+
+    def pin(self, request, response):
+        seconds = pin_seconds()
+        response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True,
+                            samesite='Lax')
+        user = request_user(request)
+        if user is not None and user.is_authenticated:
+            pin_cache().set(pin_key(user.pk), 1, seconds)
@@ -1,15 +1,23 @@
+from functools import partial
+
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
 
-from .models import Review, Comment, Title, Genre, Category
+from .fieldsets import SparseFieldsMixin
+from .leaderboards import trending_now
+from .models import Review, Comment, Title, TitleScore, Genre, Category
+from .timing import TimedSerializerMixin
 
 User = get_user_model()
 
+ONLY_ONE_REVIEW = 'Only one review allowed'
+
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin, SparseFieldsMixin,
+                        serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username'
@@ -21,14 +29,14 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         fields = ('name', 'slug')
         model = Genre
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         fields = ('name', 'slug')
@@ -40,7 +48,14 @@ class RoundingDecimalField(serializers.DecimalField):
         return value
 
 
-class TitlesSerializer(serializers.ModelSerializer):
+class TitlesSerializer(TimedSerializerMixin, SparseFieldsMixin,
+                       serializers.ModelSerializer):
+    reference_fields = {
+        'genre': partial(serializers.SlugRelatedField, many=True,
+                         read_only=True, slug_field='slug'),
+        'category': partial(serializers.SlugRelatedField, read_only=True,
+                            slug_field='slug'),
+    }
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True, many=False)
     rating = RoundingDecimalField(
@@ -55,7 +70,27 @@ class TitlesSerializer(serializers.ModelSerializer):
         model = Title
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class TitleScoreSerializer(TimedSerializerMixin,
+                           serializers.ModelSerializer):
+    """Leaderboard entry, context['board'] picks the score shown."""
+    score = serializers.SerializerMethodField()
+    title = TitlesSerializer(read_only=True)
+
+    class Meta:
+        fields = ('score', 'rating_count', 'title')
+        model = TitleScore
+
+    def get_score(self, obj):
+        if self.context.get('board') == 'trending':
+            return round(trending_now(obj, self.context.get('now')), 3)
+        return round(obj.rating, 2)
+
+
+class ReviewSerializer(TimedSerializerMixin, SparseFieldsMixin,
+                       serializers.ModelSerializer):
+    reference_fields = {
+        'title': partial(serializers.PrimaryKeyRelatedField, read_only=True),
+    }
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username'
@@ -64,22 +99,19 @@ class ReviewSerializer(serializers.ModelSerializer):
     score = serializers.IntegerField(max_value=10)
 
     def validate(self, attrs):
-        if self.context.get('request').method == 'POST':
-            title_id = self.context.get('title').id
-            reviews = self.context.get('request').user.reviews.all()
-            reviews_id_of_current_author = []
-            for review in reviews:
-                reviews_id_of_current_author.append(review.title.id)
-            if title_id in reviews_id_of_current_author:
-                raise serializers.ValidationError('Only one review allowed')
+        request = self.context.get('request')
+        if request.method == 'POST' and Review.objects.filter(
+                title=self.context.get('title'), author=request.user
+        ).exists():
+            raise serializers.ValidationError(ONLY_ONE_REVIEW)
         return attrs
 
     class Meta:
-        fields = '__all__'
+        exclude = ('comments_version',)
         model = Review
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     username = serializers.CharField(
         validators=[UniqueValidator(queryset=User.objects.all()), ],
         default=None,
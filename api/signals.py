@@ -0,0 +1,160 @@
+from django.conf import settings
+from django.db.models import F
+from django.db.models.signals import (
+    pre_save, post_save, pre_delete, post_delete, m2m_changed
+)
+from django.dispatch import receiver
+
+from .authentication import invalidate_user
+from .cache import invalidate_on_commit
+from .models import Category, Comment, Genre, Review, Title
+
+
+def change_titles(review, old=None, new=None):
+    """Move a review score between (title_id, score) states.
+
+    Every touched title also gets its version bumped, it is the ETag of
+    the title and of its reviews.
+    """
+    deltas = {}
+    for state, sign in ((old, -1), (new, 1)):
+        if state is None:
+            continue
+        title_id, score = state
+        total, count = deltas.get(title_id, (0, 0))
+        if score is not None:
+            total, count = total + sign * score, count + sign
+        deltas[title_id] = (total, count)
+    for title_id, (total, count) in deltas.items():
+        Title.objects.filter(pk=title_id).update(
+            rating_sum=F('rating_sum') + total,
+            rating_count=F('rating_count') + count,
+            version=F('version') + 1,
+        )
+        # keep an already loaded title in step, so the response nesting it
+        # does not need another query to show the new rating
+        if Review.title.is_cached(review) and review.title.pk == title_id:
+            review.title.rating_sum += total
+            review.title.rating_count += count
+
+
+def bump_titles(titles):
+    titles.update(version=F('version') + 1)
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_score(sender, instance, raw, **kwargs):
+    instance._previous_score = None
+    if instance.pk and not raw:
+        instance._previous_score = Review.objects.filter(
+            pk=instance.pk
+        ).values_list('title_id', 'score').first()
+
+
+@receiver(post_save, sender=Review)
+def add_score_to_rating(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    change_titles(
+        instance,
+        old=getattr(instance, '_previous_score', None),
+        new=(instance.title_id, instance.score),
+    )
+
+
+@receiver(post_delete, sender=Review)
+def remove_score_from_rating(sender, instance, **kwargs):
+    change_titles(instance, old=(instance.title_id, instance.score))
+
+
+@receiver(post_save, sender=Title)
+def bump_title_version(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        bump_titles(Title.objects.filter(pk=instance.pk))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_title_version_on_genres(sender, instance, action, reverse,
+                                 pk_set, **kwargs):
+    if not reverse and action.startswith('post_'):
+        bump_titles(Title.objects.filter(pk=instance.pk))
+    elif reverse and action in ('post_add', 'post_remove'):
+        bump_titles(Title.objects.filter(pk__in=pk_set))
+    elif reverse and action == 'pre_clear':
+        bump_titles(Title.objects.filter(genre=instance))
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def bump_genre_titles(sender, instance, **kwargs):
+    if not kwargs.get('created') and not kwargs.get('raw'):
+        bump_titles(Title.objects.filter(genre=instance))
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def bump_category_titles(sender, instance, **kwargs):
+    if not kwargs.get('created') and not kwargs.get('raw'):
+        bump_titles(Title.objects.filter(category=instance))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comments_version(sender, instance, **kwargs):
+    if not kwargs.get('raw'):
+        Review.objects.filter(pk=instance.review_id).update(
+            comments_version=F('comments_version') + 1
+        )
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_titles(sender, **kwargs):
+    invalidate_on_commit('titles', 'leaderboards')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genres(sender, **kwargs):
+    invalidate_on_commit('genres', 'titles', 'leaderboards')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, **kwargs):
+    invalidate_on_commit('categories', 'titles', 'leaderboards')
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def remember_previous_username(sender, instance, raw, update_fields,
+                               **kwargs):
+    instance._previous_username = None
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    if instance.pk and not raw:
+        instance._previous_username = sender.objects.filter(
+            pk=instance.pk
+        ).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def bump_renamed_author_versions(sender, instance, created, raw, **kwargs):
+    """Reviews and comments show the username of their author, a rename
+    changes the ETags of the lists they are in.
+    """
+    previous = getattr(instance, '_previous_username', None)
+    if created or raw or previous in (None, instance.username):
+        return
+    bump_titles(Title.objects.filter(reviews__author=instance))
+    Review.objects.filter(comments__author=instance).update(
+        comments_version=F('comments_version') + 1
+    )
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
@@ -0,0 +1,18 @@
+from rest_framework.throttling import SimpleRateThrottle, UserRateThrottle
+
+
+class ConfirmationCodeThrottle(SimpleRateThrottle):
+    """Limit guesses of the confirmation code of one email."""
+    scope = 'confirmation_code'
+
+    def get_cache_key(self, request, view):
+        email = request.data.get('email')
+        if not isinstance(email, str) or not email:
+            return None
+        return self.cache_format % {
+            'scope': self.scope, 'ident': email.strip().lower(),
+        }
+
+
+class ConfirmationCodeBatchThrottle(UserRateThrottle):
+    scope = 'confirmation_code_batch'
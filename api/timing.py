@@ -0,0 +1,169 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from .db.hooks import query_hooks
+
+logger = logging.getLogger('api.timing')
+
+_metrics = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.durations = {'db': 0.0, 'serialize': 0.0, 'view': 0.0}
+        self.active = set()
+        self.queries = []
+
+    def record_query(self, alias, sql, params, duration):
+        self.durations['db'] += duration
+        self.queries.append((alias, sql, params, duration))
+
+    def ms(self, name):
+        return round(self.durations[name] * 1000, 3)
+
+
+@contextmanager
+def timer(name):
+    """Add the time of the block to the current request, if it is sampled.
+
+    Nested blocks of the same name are counted once.
+    """
+    metrics = _metrics.get()
+    if metrics is None or name in metrics.active:
+        yield
+        return
+    metrics.active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.durations[name] = (metrics.durations.get(name, 0.0)
+                                   + time.perf_counter() - started)
+        metrics.active.discard(name)
+
+
+class TimedSerializerMixin:
+    """Count to_representation() of the serializer as serialize time."""
+
+    def to_representation(self, instance):
+        with timer('serialize'):
+            return super().to_representation(instance)
+
+
+def query_recorder(metrics):
+    def record(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics.record_query(context['connection'].alias, sql, params,
+                                 time.perf_counter() - started)
+    return record
+
+
+class ServerTimingMiddleware:
+    """Report db, serialize, view and total time of sampled requests.
+
+    The numbers go to the Server-Timing header and to the api.timing
+    logger; requests over REQUEST_TIMING_SLOW_QUERIES queries or
+    REQUEST_TIMING_SLOW_MS milliseconds are logged with their SQL.
+    """
+
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # what django checks to await the middleware, see MiddlewareMixin
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = _metrics.set(metrics)
+        try:
+            with query_hooks(query_recorder(metrics)):
+                response = self.get_response(request)
+        finally:
+            _metrics.reset(token)
+        self.report(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        metrics = RequestMetrics()
+        token = _metrics.set(metrics)
+        try:
+            with query_hooks(query_recorder(metrics)):
+                response = await self.get_response(request)
+        finally:
+            _metrics.reset(token)
+        self.report(request, response, metrics)
+        return response
+
+    def sampled(self):
+        rate = getattr(settings, 'REQUEST_TIMING_SAMPLE_RATE', 1.0)
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def report(self, request, response, metrics):
+        finished = time.perf_counter()
+        if metrics.view_started is not None:
+            metrics.durations['view'] = finished - metrics.view_started
+        metrics.durations['total'] = finished - metrics.started
+        response['Server-Timing'] = self.server_timing(metrics)
+        self.log(request, response, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _metrics.get()
+        if metrics is not None:
+            metrics.view_started = time.perf_counter()
+
+    def server_timing(self, metrics):
+        return ', '.join((
+            f'db;dur={metrics.ms("db")};desc="{len(metrics.queries)} queries"',
+            f'serialize;dur={metrics.ms("serialize")}',
+            f'view;dur={metrics.ms("view")}',
+            f'total;dur={metrics.ms("total")}',
+        ))
+
+    def log(self, request, response, metrics):
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': len(metrics.queries),
+            'db_ms': metrics.ms('db'),
+            'serialize_ms': metrics.ms('serialize'),
+            'view_ms': metrics.ms('view'),
+            'total_ms': metrics.ms('total'),
+        }
+        slow = (
+            len(metrics.queries) > getattr(
+                settings, 'REQUEST_TIMING_SLOW_QUERIES', 50
+            )
+            or metrics.ms('total') > getattr(
+                settings, 'REQUEST_TIMING_SLOW_MS', 500
+            )
+        )
+        if not slow:
+            logger.info(json.dumps(record), extra={'timing': record})
+            return
+        record['sql'] = [
+            {'alias': alias, 'sql': sql, 'params': repr(params),
+             'ms': round(duration * 1000, 3)}
+            for alias, sql, params, duration in metrics.queries
+        ]
+        logger.warning(json.dumps(record), extra={'timing': record})
@@ -8,10 +8,16 @@ from .views import (
     TitleViewSet, GenreAPIView, CategoryAPIView,
     UserViewSet,
     send_email,
-    send_JWT
+    send_JWT,
+    send_JWT_batch,
+    export,
+    LeaderboardView,
 )
+from django.conf import settings
 from django.urls import path, include
 
+from .async_views import async_read_routes
+
 
 router = DefaultRouter()
 router.register(r'titles', TitleViewSet, basename='titles')
@@ -24,13 +30,20 @@ router.register(r'genres', GenreAPIView, basename='genres')
 router.register(r'categories', CategoryAPIView, basename='categories')
 router.register(r'users', UserViewSet, basename='users',)
 
+routes = router.urls
+if getattr(settings, 'ASYNC_READ_VIEWS', False):
+    routes = async_read_routes(routes)
 
 urlpatterns = [
-    path('v1/', include(router.urls)),
+    path('v1/', include(routes)),
     path('v1/token/', TokenObtainPairView.as_view(),
          name='token_obtain_pair'),
     path('v1/token/refresh/', TokenRefreshView.as_view(),
          name='token_refresh'),
-    path('v1/auth/email/', send_email),
-    path('v1/auth/token/', send_JWT),
+    path('v1/auth/email/', send_email, name='auth_email'),
+    path('v1/auth/token/', send_JWT, name='auth_token'),
+    path('v1/auth/token/batch/', send_JWT_batch, name='auth_token_batch'),
+    path('v1/export/<str:dataset>/', export, name='export'),
+    path('v1/leaderboards/<str:board>/', LeaderboardView.as_view(),
+         name='leaderboard'),
 ]
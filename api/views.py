@@ -1,23 +1,45 @@
 from datetime import datetime as dt
+from functools import partial
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404, get_list_or_404
-from django.core.mail import EmailMessage
+from django.http import Http404, StreamingHttpResponse
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework.decorators import (
+    api_view, permission_classes, throttle_classes, action,
+)
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet, generics
 from rest_framework import mixins, viewsets
 from rest_framework.pagination import PageNumberPagination
 
-from .pagination import NumberPagination
+from .bulk import BULK_LIMIT, bulk_upsert_titles
+from .cache import CachedResponseMixin
+from .export import DATASETS, FORMATS, export_lines
+from .fieldsets import FieldsetMixin
+from .fastpath import (
+    CommentValuesSerializer, ReviewValuesSerializer, TitleValuesSerializer,
+    ValuesReadMixin,
+)
+from .leaderboards import BOARDS, leaderboard
+from .conditional import ConditionalGetMixin
+from .pagination import NumberPagination, OptionalCursorPagination
+from .stats import STATS_BATCH_LIMIT, is_id, score_stats
 from .filters import TitleFilter
+from .mail import queue_email
 from .models import Review, Title, Genre, Category
+from .throttles import (
+    ConfirmationCodeBatchThrottle, ConfirmationCodeThrottle,
+)
 from .serializers import (
     ReviewSerializer, CommentSerializer, TitlesSerializer, GenreSerializer,
     CategorySerializer, UserSerializer, TokenSerializer,
-    ConfirmationCodeSerializer,
+    ConfirmationCodeSerializer, TitleScoreSerializer, ONLY_ONE_REVIEW,
 )
 from .permissions import (
     IsNotAuth, IsAdminOrReadOnly,
@@ -28,52 +50,87 @@ from .permissions import (
     IsAuthenticated
 )
 from .confirmation_code import ConfirmationCodeGenerator
-from django.db.models import Avg
 
 confirmation_code_generator = ConfirmationCodeGenerator()
+CONFIRMATION_BATCH_LIMIT = 1000
 User = get_user_model()
 
 
-class ReviewViewSet(ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, FieldsetMixin, ValuesReadMixin,
+                    ModelViewSet):
     """Create, get, update reviews"""
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
+    values_serializer_class = ReviewValuesSerializer
+    fieldset_fields = ('id', 'author', 'title', 'score', 'text', 'pub_date')
+    expandable_fields = ('title',)
+    pagination_class = OptionalCursorPagination
     permission_classes = [IsAuthenticatedOrReadOnly,
                           IsAuthorOrModeratorOrAdminOrReadOnly]
 
+    def get_title(self):
+        if not hasattr(self, '_title'):
+            titles = Title.objects.with_relations()
+            if not self.get_fieldset().expands('title'):
+                # only the id is shown, the version makes the ETag
+                titles = Title.objects.only('id', 'version')
+            self._title = get_object_or_404(titles, pk=self.kwargs['title_id'])
+        return self._title
+
+    def get_etag_version(self):
+        return self.get_title().version
+
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs['title_id'])
-        serializer.save(author=self.request.user, title=title)
+        try:
+            serializer.save(author=self.request.user, title=self.get_title())
+        except IntegrityError:
+            # a concurrent request created the review after validate()
+            raise ValidationError({'non_field_errors': [ONLY_ONE_REVIEW]})
 
     def get_queryset(self):
-        queryset = get_object_or_404(
-            Title, pk=self.kwargs['title_id']
-        ).reviews.all()
-        return queryset
+        reviews = self.get_title().reviews.all()
+        if self.get_fieldset().includes('author'):
+            reviews = reviews.select_related('author')
+        return reviews
 
     def get_serializer_context(self):
-        title = get_object_or_404(Title, pk=self.kwargs['title_id'])
         context = super(ReviewViewSet, self).get_serializer_context()
-        context.update({"request": self.request, 'title': title})
+        context.update({"request": self.request, 'title': self.get_title()})
         return context
 
 
-class CommentViewSet(ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, FieldsetMixin, ValuesReadMixin,
+                     ModelViewSet):
     """Create, get, update comments for reviews"""
     serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
+    fieldset_fields = ('id', 'text', 'author', 'pub_date')
+    pagination_class = OptionalCursorPagination
     permission_classes = [IsAuthenticatedOrReadOnly,
                           IsAuthorOrModeratorOrAdminOrReadOnly]
 
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review, id=self.kwargs['review_id']
+            )
+        return self._review
+
+    def get_etag_version(self):
+        return self.get_review().comments_version
+
     def perform_create(self, serializer):
         serializer.save(
             author=self.request.user,
-            review_id=self.kwargs['review_id'],
+            review=self.get_review(),
             pub_date=dt.now()
         )
 
     def get_queryset(self):
-        review = get_object_or_404(Review, id=self.kwargs['review_id'])
-        return review.comments.all()
+        comments = self.get_review().comments.all()
+        if self.get_fieldset().includes('author'):
+            comments = comments.select_related('author')
+        return comments
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -87,17 +144,88 @@ class CommentViewSet(ModelViewSet):
         )
 
     def check_exist(self):
-        get_object_or_404(Review, id=self.kwargs['review_id'])
+        self.get_review()
 
 
-class TitleViewSet(ModelViewSet):
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score'))
+class TitleViewSet(ConditionalGetMixin, CachedResponseMixin, FieldsetMixin,
+                   ValuesReadMixin, ModelViewSet):
+    cache_namespace = 'titles'
+    conditional_actions = ('retrieve', 'stats')
+    queryset = Title.objects.with_relations()
     serializer_class = TitlesSerializer
+    values_serializer_class = TitleValuesSerializer
+    values_actions = ('list', 'retrieve')
+    fieldset_fields = (
+        'id', 'name', 'year', 'rating', 'description', 'genre', 'category'
+    )
+    expandable_fields = ('genre', 'category')
     pagination_class = PageNumberPagination
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_class = TitleFilter
 
+    def get_etag_version(self):
+        try:
+            pk = int(self.kwargs['pk'])
+        except (TypeError, ValueError):
+            # the lookup of the action answers 404
+            return None
+        return Title.objects.filter(pk=pk).values_list(
+            'version', flat=True
+        ).first()
+
+    def get_cache_query_params(self):
+        return super().get_cache_query_params() | {'ids', 'fields', 'expand'}
+
+    def get_queryset(self):
+        titles = super().get_queryset()
+        fieldset = self.get_fieldset()
+        if not fieldset.includes('category'):
+            titles = titles.select_related(None)
+        if not fieldset.includes('genre'):
+            titles = titles.prefetch_related(None)
+        return titles
+
+    def title_stats(self, request, pk=None):
+        stats = score_stats([int(pk)]) if is_id(pk) else []
+        if not stats:
+            raise Http404
+        return Response(stats[0])
+
+    def titles_stats(self, request):
+        ids = request.query_params.get('ids', '').split(',')
+        if not all(map(is_id, ids)) or len(
+                ids) > STATS_BATCH_LIMIT:
+            raise ValidationError({'ids': [
+                f'Expected at most {STATS_BATCH_LIMIT} comma separated ids'
+            ]})
+        return Response(score_stats(list(dict.fromkeys(map(int, ids)))))
+
+    @action(methods=['GET'], detail=True)
+    def stats(self, request, pk=None):
+        """Score histogram, count and mean of the title reviews."""
+        return self.conditional_response(
+            partial(self.cached_response, self.title_stats), request, pk=pk
+        )
+
+    @action(methods=['GET'], detail=False, url_path='stats',
+            url_name='stats-batch')
+    def stats_batch(self, request):
+        """Stats of the titles listed in ?ids=1,2,3, unknown ids left out."""
+        return self.cached_response(self.titles_stats, request)
+
+    @action(methods=['POST'], detail=False)
+    def bulk(self, request):
+        """Create or update (items with an id) up to BULK_LIMIT titles."""
+        if not isinstance(request.data, list) or len(
+                request.data) > BULK_LIMIT:
+            return Response(
+                {'detail': f'Expected a list of at most {BULK_LIMIT} titles'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(bulk_upsert_titles(request.data),
+                        status=status.HTTP_200_OK)
+
     def perform_create(self, serializer):
         slug_genre = self.request.data.get('genre')
         if isinstance(slug_genre, str):
@@ -124,10 +252,12 @@ class TitleViewSet(ModelViewSet):
             serializer.save()
 
 
-class GenreAPIView(mixins.CreateModelMixin,
+class GenreAPIView(CachedResponseMixin,
+                   mixins.CreateModelMixin,
                    mixins.ListModelMixin,
                    mixins.DestroyModelMixin,
                    viewsets.GenericViewSet):
+    cache_namespace = 'genres'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     pagination_class = NumberPagination
@@ -137,10 +267,12 @@ class GenreAPIView(mixins.CreateModelMixin,
     search_fields = ['name']
 
 
-class CategoryAPIView(mixins.CreateModelMixin,
+class CategoryAPIView(CachedResponseMixin,
+                      mixins.CreateModelMixin,
                       mixins.ListModelMixin,
                       mixins.DestroyModelMixin,
                       viewsets.GenericViewSet):
+    cache_namespace = 'categories'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     pagination_class = NumberPagination
@@ -150,23 +282,71 @@ class CategoryAPIView(mixins.CreateModelMixin,
     search_fields = ['name']
 
 
+class LeaderboardView(CachedResponseMixin, generics.ListAPIView):
+    """Top rated or trending titles, optionally of a category or a genre.
+
+    Served from TitleScore, kept up to date by `refresh_leaderboards`.
+    """
+    cache_namespace = 'leaderboards'
+    serializer_class = TitleScoreSerializer
+    permission_classes = [AllowAny]
+    filter_backends = []
+    pagination_class = None
+
+    def get_cache_query_params(self):
+        return {'category', 'genre', 'limit', 'min_reviews'}
+
+    def get_int_param(self, name, default, maximum=None):
+        value = self.request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError({name: ['A valid integer is required.']})
+        if value < 1 or maximum is not None and value > maximum:
+            raise ValidationError({name: [
+                f'Expected a number from 1 to {maximum}.' if maximum
+                else 'Expected a positive number.'
+            ]})
+        return value
+
+    def get_queryset(self):
+        if self.kwargs['board'] not in BOARDS:
+            raise Http404
+        limit = self.get_int_param('limit', getattr(
+            settings, 'LEADERBOARD_SIZE', 10
+        ), maximum=getattr(settings, 'LEADERBOARD_MAX_SIZE', 100))
+        return leaderboard(
+            self.kwargs['board'],
+            category=self.request.query_params.get('category'),
+            genre=self.request.query_params.get('genre'),
+            min_reviews=self.get_int_param('min_reviews', getattr(
+                settings, 'LEADERBOARD_MIN_REVIEWS', 1
+            )),
+        )[:limit]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context.update(board=self.kwargs.get('board'), now=timezone.now())
+        return context
+
+
 @api_view(http_method_names=['POST'])
 @permission_classes((IsNotAuth, ))
 def send_email(request):
     serializer = UserSerializer(data=request.data)
     if serializer.is_valid():
-        user = User.objects.create(email=request.data.get('email'))
-        user.is_active = False
-        user.set_unusable_password()
-        user.save()
-        confirmation_code = confirmation_code_generator.make_token(
-            user)
-        mail_subject = 'Activate your account.'
-        message = (f"Hello, your confirmation_code: "
-                   f"{confirmation_code}")
-        to_email = str(request.data.get('email'))
-        email = EmailMessage(mail_subject, message, to=[to_email])
-        email.send()
+        with transaction.atomic():
+            user = User(email=request.data.get('email'), is_active=False)
+            user.set_unusable_password()
+            user.save()
+            confirmation_code = confirmation_code_generator.make_token(
+                user)
+            mail_subject = 'Activate your account.'
+            message = (f"Hello, your confirmation_code: "
+                       f"{confirmation_code}")
+            to_email = str(request.data.get('email'))
+            # sent by the send_queued_email worker
+            queue_email(mail_subject, message, to_email)
         return Response({'email': serializer.data['email'],
                          'confirmation code': str(confirmation_code)},
                                 status=status.HTTP_200_OK)
@@ -177,13 +357,26 @@ def send_email(request):
 
 @api_view(http_method_names=['POST'])
 @permission_classes((AllowAny, ))
+@throttle_classes((ConfirmationCodeThrottle, ))
 def send_JWT(request):
-    user = User.objects.get(email=request.data.get('email'))
+    # the confirmation code depends on pk and is_active only
+    try:
+        user = User.objects.only('id', 'is_active').get(
+            email=request.data.get('email')
+        )
+    except User.DoesNotExist:
+        return Response(status=status.HTTP_400_BAD_REQUEST)
     if confirmation_code_generator.check_token(user,
                                                request.data.get(
                                                'confirmation_code')):
-        user.is_active = True
-        user.save()
+        if not user.is_active:
+            # a concurrent request that activated the user first has
+            # already used this code
+            if not User.objects.filter(
+                    pk=user.pk, is_active=False
+            ).update(is_active=True):
+                return Response(status=status.HTTP_400_BAD_REQUEST)
+            user.is_active = True
         data = {
             'token': str(ConfirmationCodeSerializer.get_token(user))
         }
@@ -192,6 +385,65 @@ def send_JWT(request):
     return Response(status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(http_method_names=['POST'])
+@permission_classes((IsAdmin, ))
+@throttle_classes((ConfirmationCodeBatchThrottle, ))
+def send_JWT_batch(request):
+    """Check a list of {email, confirmation_code} with two queries.
+
+    Answers a list of {email, token} or {email, error} in request order.
+    """
+    items = request.data
+    if (not isinstance(items, list) or len(items) > CONFIRMATION_BATCH_LIMIT
+            or not all(isinstance(item, dict) for item in items)):
+        return Response(
+            {'detail': f'Expected a list of at most '
+                       f'{CONFIRMATION_BATCH_LIMIT} objects'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    emails = [str(item.get('email')) for item in items]
+    results, activate = [], []
+    with transaction.atomic():
+        users = {
+            user.email: user for user in User.objects.select_for_update(
+            ).only('id', 'email', 'is_active').filter(email__in=emails)
+        }
+        for email, item in zip(emails, items):
+            user = users.get(email)
+            if user is None or not confirmation_code_generator.check_token(
+                    user, item.get('confirmation_code')):
+                results.append({'email': email, 'error': 'invalid code'})
+                continue
+            if not user.is_active:
+                activate.append(user.pk)
+                # the code can not be used twice within the batch
+                user.is_active = True
+            results.append({
+                'email': email,
+                'token': str(ConfirmationCodeSerializer.get_token(user)),
+            })
+        if activate:
+            User.objects.filter(
+                pk__in=activate, is_active=False
+            ).update(is_active=True)
+    return Response(results, status=status.HTTP_200_OK)
+
+
+@api_view(http_method_names=['GET'])
+@permission_classes((IsAdmin, ))
+def export(request, dataset):
+    output = request.query_params.get('output', 'ndjson')
+    if dataset not in DATASETS or output not in FORMATS:
+        raise Http404
+    response = StreamingHttpResponse(
+        export_lines(dataset, output), content_type=FORMATS[output][1]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{dataset}.{output}"'
+    )
+    return response
+
+
 class UserViewSet(viewsets.ViewSetMixin,
                   generics.ListCreateAPIView,
                   generics.RetrieveUpdateDestroyAPIView):
@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+
+from api.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+os.environ.setdefault('ASYNC_READ_VIEWS', '1')
+
+# what get_asgi_application() does, with the handler streaming the
+# export from a thread
+django.setup(set_prefix=False)
 
-application = get_asgi_application()
+application = ASGIHandler()
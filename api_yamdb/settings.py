@@ -39,12 +39,15 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'users',
-    'api',
+    'api.apps.ApiConfig',
     'rest_framework',
     'django_filters',
 ]
 
 MIDDLEWARE = [
+    'api.metrics.PrometheusMiddleware',
+    'api.timing.ServerTimingMiddleware',
+    'api.routers.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,6 +59,10 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'api_yamdb.urls'
 
+# api_yamdb.asgi turns this on: the hot read paths become async views that
+# run in a thread pool, see api.async_views
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS') == '1'
+
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
 TEMPLATES = [
     {
@@ -79,17 +86,69 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
 
+# connections per worker process kept by api.db.pool; 0 (the default)
+# keeps one persistent connection per worker thread instead
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 0))
+# seconds a connection is reused for, 0 opens a connection per request
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 600))
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'api.db.postgresql' if DB_POOL_SIZE
+        else 'django.db.backends.postgresql',
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('POSTGRES_USER'),
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD'),
         'HOST': os.environ.get('DB_HOST'),
         'PORT': os.environ.get('DB_PORT'),
+        # the pool gets the connection back at the end of every request
+        'CONN_MAX_AGE': 0 if DB_POOL_SIZE else DB_CONN_MAX_AGE,
+        'POOL': {
+            'SIZE': DB_POOL_SIZE,
+            'MAX_LIFETIME': DB_CONN_MAX_AGE,
+            'IDLE_TIMEOUT': int(os.environ.get('DB_CONN_IDLE_TIMEOUT', 60)),
+            # idle connections are checked with SELECT 1 after this long
+            'CHECK_AFTER': float(os.environ.get('DB_CONN_CHECK_AFTER', 1)),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        },
+    }
+}
+
+# read-only replicas of 'default': DB_REPLICA_HOSTS=host[:port],...
+for number, replica in enumerate(filter(None, os.environ.get(
+        'DB_REPLICA_HOSTS', '').split(',')), 1):
+    host, _, port = replica.partition(':')
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# the primary keys of the migrations
+DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
+
+# GET and HEAD requests read from these, see api.routers
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+# seconds the reads of a client or user go to 'default' after it writes
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+# seconds a response read from a replica may stay in the catalog cache
+REPLICA_CACHE_TIMEOUT = 30
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
     }
 }
 
+CATALOG_CACHE_ALIAS = 'default'
+
+CATALOG_CACHE_TIMEOUT = 60 * 10
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -138,15 +197,33 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ],
+
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
 
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.PageNumberPagination',
 
     'PAGE_SIZE': 10,
+
+    'DEFAULT_THROTTLE_RATES': {
+        'confirmation_code': '10/min',
+        'confirmation_code_batch': '60/min',
+    },
 }
 
+# title, review and comment lists and title details are built from
+# .values() rows, see api.fastpath
+FAST_READ_SERIALIZERS = True
+
+# seconds a gunicorn worker may use a cached user (role, is_active)
+# saved by another worker, see api.authentication
+JWT_USER_CACHE_TTL = 30
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=1440),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -176,3 +253,40 @@ SIMPLE_JWT = {
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
+
+# api.mail queue, delivered by `manage.py send_queued_email`
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+EMAIL_QUEUE_BACKOFF_SECONDS = 60
+
+# api.leaderboards, rebuilt by `manage.py refresh_leaderboards`
+LEADERBOARD_SIZE = 10
+LEADERBOARD_MAX_SIZE = 100
+LEADERBOARD_MIN_REVIEWS = 1
+# a review weighs half as much after a half-life, nothing after the window
+LEADERBOARD_TRENDING_HALF_LIFE = 3 * 24 * 60 * 60
+LEADERBOARD_TRENDING_WINDOW = 30 * 24 * 60 * 60
+
+# share of requests measured by api.timing.ServerTimingMiddleware, 0..1
+REQUEST_TIMING_SAMPLE_RATE = float(
+    os.environ.get('REQUEST_TIMING_SAMPLE_RATE', 1)
+)
+# sampled requests over these limits are logged with their full SQL
+REQUEST_TIMING_SLOW_QUERIES = int(
+    os.environ.get('REQUEST_TIMING_SLOW_QUERIES', 50)
+)
+REQUEST_TIMING_SLOW_MS = float(os.environ.get('REQUEST_TIMING_SLOW_MS', 500))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.timing': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_TIMING_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,56 @@
+"""Compare two benchmark result files, exit with 1 on a regression.
+
+    python benchmarks/compare.py base.json new.json --max-slowdown 1.25
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as source:
+        return json.load(source)
+
+
+def compare(base, new, metric='p90', max_slowdown=1.25, min_ms=0.5):
+    """Yield (endpoint, message, regressed) for the common endpoints."""
+    for name in sorted(set(base['endpoints']) | set(new['endpoints'])):
+        old = base['endpoints'].get(name)
+        current = new['endpoints'].get(name)
+        if old is None or current is None:
+            yield name, 'only in ' + ('new' if old is None else 'base'), False
+            continue
+        before = old['latency_ms'][metric]
+        after = current['latency_ms'][metric]
+        ratio = after / before if before else float('inf')
+        # sub-millisecond differences are noise, not regressions
+        slower = ratio > max_slowdown and after - before > min_ms
+        more_queries = current['queries'] > old['queries']
+        yield name, (
+            f'{metric} {before:.2f} -> {after:.2f} ms (x{ratio:.2f}), '
+            f'queries {old["queries"]} -> {current["queries"]}'
+        ), slower or more_queries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('base')
+    parser.add_argument('new')
+    parser.add_argument('--metric', default='p90',
+                        choices=('min', 'p50', 'p90', 'p99', 'max', 'mean'))
+    parser.add_argument('--max-slowdown', type=float, default=1.25)
+    parser.add_argument('--min-ms', type=float, default=0.5)
+    args = parser.parse_args(argv)
+    base, new = load(args.base), load(args.new)
+    if base['meta']['sizes'] != new['meta']['sizes']:
+        print('warning: the runs used different data sizes', file=sys.stderr)
+    regressions = 0
+    for name, message, regressed in compare(
+            base, new, args.metric, args.max_slowdown, args.min_ms):
+        regressions += regressed
+        print(f'{"REGRESSION" if regressed else "ok":<10} {name}: {message}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import json
+import platform
+from datetime import datetime
+
+import django
+import pytest
+from django.db import connection
+
+RESULTS = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmark')
+    group.addoption('--bench-users', type=int, default=300)
+    group.addoption('--bench-titles', type=int, default=1000)
+    group.addoption('--bench-reviews', type=int, default=20000)
+    group.addoption('--bench-comments', type=int, default=5000)
+    group.addoption('--bench-iterations', type=int, default=30)
+    group.addoption(
+        '--bench-bulk-titles', type=int, default=1000,
+        help='Titles created by test_bulk, one by one and in one batch'
+    )
+    group.addoption('--bench-seed', type=int, default=0)
+    group.addoption(
+        '--bench-verifications', type=int, default=2000,
+        help='Confirmation codes checked by test_auth'
+    )
+    group.addoption(
+        '--bench-requests', type=int, default=2000,
+        help='Requests served in every mode by test_connections and '
+             'test_concurrency'
+    )
+    group.addoption(
+        '--bench-clients', type=int, default=100,
+        help='Concurrent clients of test_concurrency'
+    )
+    group.addoption(
+        '--bench-client-delay', type=float, default=50,
+        help='Milliseconds a test_concurrency client takes to send its '
+             'request, and again to read the response'
+    )
+    group.addoption(
+        '--bench-wsgi-workers', type=int, default=4,
+        help='Sync workers of the WSGI run of test_concurrency'
+    )
+    group.addoption(
+        '--bench-warm-cache', action='store_true',
+        help='Keep the catalog response cache between iterations'
+    )
+    group.addoption('--bench-output', default='benchmark-results.json')
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1,
+                       round(share * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def latency_summary(timings):
+    """min/p50/p90/p99/max/mean of timings given in milliseconds."""
+    return {
+        'min': round(min(timings), 3),
+        'p50': round(percentile(timings, 0.5), 3),
+        'p90': round(percentile(timings, 0.9), 3),
+        'p99': round(percentile(timings, 0.99), 3),
+        'max': round(max(timings), 3),
+        'mean': round(sum(timings) / len(timings), 3),
+    }
+
+
+def sizes(config):
+    return {
+        'users': config.getoption('--bench-users'),
+        'categories': 10,
+        'genres': 30,
+        'titles': config.getoption('--bench-titles'),
+        'reviews': config.getoption('--bench-reviews'),
+        'comments': config.getoption('--bench-comments'),
+    }
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker, request):
+    from api.datagen import generate
+    with django_db_blocker.unblock():
+        generate(seed=request.config.getoption('--bench-seed'),
+                 **sizes(request.config))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not RESULTS:
+        return
+    config = session.config
+    report = {
+        'meta': {
+            'created': datetime.utcnow().isoformat() + 'Z',
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'sizes': sizes(config),
+            'seed': config.getoption('--bench-seed'),
+            'iterations': config.getoption('--bench-iterations'),
+            'warm_cache': config.getoption('--bench-warm-cache'),
+        },
+        'endpoints': dict(sorted(RESULTS.items())),
+    }
+    with open(config.getoption('--bench-output'), 'w') as output:
+        json.dump(report, output, indent=2, ensure_ascii=False)
@@ -0,0 +1,83 @@
+"""Confirmation code checks per second, one by one and in batches."""
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.datagen import bulk_insert
+from api.throttles import ConfirmationCodeBatchThrottle
+from api.views import confirmation_code_generator
+
+from .conftest import RESULTS, latency_summary
+
+User = get_user_model()
+
+
+BATCH_SIZE = 500
+
+
+def codes(prefix, count):
+    user_ids = bulk_insert(User, (
+        User(email=f'{prefix}{i}@yamdb.fake', username=f'{prefix}{i}',
+             is_active=False)
+        for i in range(count)
+    ))
+    return user_ids, [
+        {'email': user.email,
+         'confirmation_code': confirmation_code_generator.make_token(user)}
+        for user in User.objects.filter(pk__in=user_ids).only(
+            'id', 'email', 'is_active'
+        )
+    ]
+
+
+def run(name, route, client, requests, verifications):
+    url = reverse(route)
+    timings = []
+    with CaptureQueriesContext(connection) as captured:
+        started = time.perf_counter()
+        for data in requests:
+            request_started = time.perf_counter()
+            response = client.post(url, data, format='json')
+            timings.append((time.perf_counter() - request_started) * 1000)
+            assert response.status_code == 200
+        elapsed = time.perf_counter() - started
+    RESULTS[name] = {
+        'method': 'POST',
+        'route': route,
+        'status': [200],
+        'iterations': len(requests),
+        'queries': len(captured.captured_queries) // len(requests),
+        'per_second': round(verifications / elapsed, 1),
+        'latency_ms': latency_summary(timings),
+    }
+
+
+@pytest.mark.django_db
+def test_confirmation_code_throughput(request):
+    count = request.config.getoption('--bench-verifications')
+    user_ids, requests = codes('verify', count)
+    run('auth token throughput', 'auth_token', APIClient(), requests, count)
+    assert not User.objects.filter(pk__in=user_ids, is_active=False).exists()
+
+
+@pytest.mark.django_db
+def test_confirmation_code_batch_throughput(request, monkeypatch):
+    # the benchmark sends more batches than an admin may in a minute
+    monkeypatch.setattr(ConfirmationCodeBatchThrottle, 'rate', '100000/min',
+                        raising=False)
+    count = request.config.getoption('--bench-verifications')
+    user_ids, requests = codes('verify-batch', count)
+    admin = User.objects.create(email='verify-admin@yamdb.fake',
+                                role='admin')
+    client = APIClient()
+    client.force_authenticate(admin)
+    batches = [requests[start:start + BATCH_SIZE]
+               for start in range(0, count, BATCH_SIZE)]
+    run('auth token batch throughput', 'auth_token_batch', client,
+        batches, count)
+    assert not User.objects.filter(pk__in=user_ids, is_active=False).exists()
@@ -0,0 +1,74 @@
+"""Title ingest: single POSTs against one POST to /titles/bulk/."""
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.models import Category, Genre, Title
+
+from .conftest import RESULTS, latency_summary
+
+
+@pytest.fixture
+def admin_client(django_user_model):
+    admin = django_user_model.objects.create(
+        email='bulk-admin@yamdb.fake', username='bulk-admin', role='admin'
+    )
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+def items(prefix, count):
+    genres = list(Genre.objects.values_list('slug', flat=True)[:3])
+    category = Category.objects.values_list('slug', flat=True).first()
+    return [
+        {'name': f'{prefix} {number}', 'year': 2000, 'category': category,
+         'genre': genres[:number % 3 + 1]}
+        for number in range(count)
+    ]
+
+
+@pytest.mark.django_db
+def test_single_posts(request, admin_client):
+    count = request.config.getoption('--bench-bulk-titles')
+    url = reverse('titles-list')
+    timings = []
+    with CaptureQueriesContext(connection) as captured:
+        started = time.perf_counter()
+        for item in items('Single', count):
+            request_started = time.perf_counter()
+            response = admin_client.post(url, item, format='json')
+            timings.append((time.perf_counter() - request_started) * 1000)
+            assert response.status_code == 201
+        elapsed = time.perf_counter() - started
+    RESULTS['titles ingest single'] = {
+        'method': 'POST', 'route': 'titles-list', 'status': [201],
+        'iterations': count,
+        'queries': len(captured.captured_queries) // count,
+        'per_second': round(count / elapsed, 1),
+        'latency_ms': latency_summary(timings),
+    }
+
+
+@pytest.mark.django_db
+def test_bulk_post(request, admin_client):
+    count = request.config.getoption('--bench-bulk-titles')
+    url = reverse('titles-bulk')
+    batch = items('Bulk', count)
+    before = Title.objects.count()
+    with CaptureQueriesContext(connection) as captured:
+        started = time.perf_counter()
+        response = admin_client.post(url, batch, format='json')
+        elapsed = time.perf_counter() - started
+    assert response.status_code == 200
+    assert Title.objects.count() - before == count
+    RESULTS['titles ingest bulk'] = {
+        'method': 'POST', 'route': 'titles-bulk', 'status': [200],
+        'iterations': 1, 'queries': len(captured.captured_queries),
+        'per_second': round(count / elapsed, 1),
+        'latency_ms': latency_summary([elapsed * 1000]),
+    }
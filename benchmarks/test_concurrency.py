@@ -0,0 +1,132 @@
+"""Title detail requests of many slow clients under WSGI and ASGI.
+
+Every client spends --bench-client-delay milliseconds sending its request
+and as long again reading the response. Under WSGI a sync worker (as in
+the gunicorn setup of the Dockerfile) is busy for all of that time, so
+--bench-wsgi-workers threads stand for the workers. Under ASGI the event
+loop waits for slow clients and only the view takes a thread, see
+api.async_views.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from functools import partial
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import RequestFactory
+from django.urls import include, path
+
+from api.async_views import async_read_routes
+from api.db.hooks import query_hooks
+from api.models import Title
+from api.urls import router
+
+from .conftest import RESULTS, latency_summary
+
+# what api_yamdb.asgi serves with ASYNC_READ_VIEWS
+urlpatterns = [path('api/v1/', include(async_read_routes(router.urls)))]
+
+
+def count_query(queries, execute, sql, params, many, context):
+    queries.append(1)
+    return execute(sql, params, many, context)
+
+
+def serve_wsgi(urls, clients, workers, delay):
+    handler = WSGIHandler()
+    factory = RequestFactory()
+    # a sync worker serves one client at a time
+    busy = threading.BoundedSemaphore(workers)
+    statuses, timings, queries = set(), [], []
+
+    def client(urls):
+        for url in urls:
+            started = time.perf_counter()
+            with busy, query_hooks(partial(count_query, queries)):
+                time.sleep(delay)
+                response = handler(factory.get(url).environ,
+                                   lambda status, headers: None)
+                b''.join(response)
+                response.close()
+                time.sleep(delay)
+            statuses.add(response.status_code)
+            timings.append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=client, args=(urls[number::clients],))
+               for number in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return statuses, timings, len(queries)
+
+
+def serve_asgi(urls, clients, delay):
+    handler = ASGIHandler()
+    statuses, timings, queries = set(), [], []
+
+    async def client(urls):
+        for url in urls:
+            started = time.perf_counter()
+
+            async def receive():
+                await asyncio.sleep(delay)
+                return {'type': 'http.request', 'body': b''}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.add(message['status'])
+                elif not message.get('more_body'):
+                    await asyncio.sleep(delay)
+
+            await handler({
+                'type': 'http', 'asgi': {'version': '3.0'},
+                'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+                'path': url, 'query_string': b'',
+                'headers': [(b'host', b'testserver')],
+                'server': ('testserver', 80), 'client': ('127.0.0.1', 0),
+            }, receive, send)
+            timings.append((time.perf_counter() - started) * 1000)
+
+    async def run():
+        with query_hooks(partial(count_query, queries)):
+            await asyncio.gather(*(client(urls[number::clients])
+                                   for number in range(clients)))
+
+    asyncio.run(run())
+    return statuses, timings, len(queries)
+
+
+def test_slow_clients(db, request, settings):
+    config = request.config
+    count = config.getoption('--bench-requests')
+    clients = config.getoption('--bench-clients')
+    delay = config.getoption('--bench-client-delay') / 1000
+    title_ids = list(Title.objects.values_list('pk', flat=True))
+    urls = [f'/api/v1/titles/{title_id}/'
+            for title_id in itertools.islice(itertools.cycle(title_ids),
+                                             count)]
+    modes = {
+        'concurrency wsgi': lambda: serve_wsgi(
+            urls, clients, config.getoption('--bench-wsgi-workers'), delay
+        ),
+        'concurrency asgi': lambda: serve_asgi(urls, clients, delay),
+    }
+    for name, serve in modes.items():
+        if name == 'concurrency asgi':
+            settings.ROOT_URLCONF = __name__
+        started = time.perf_counter()
+        statuses, timings, queries = serve()
+        elapsed = time.perf_counter() - started
+        assert statuses == {200}
+        RESULTS[name] = {
+            'method': 'GET',
+            'route': 'titles-detail',
+            'status': sorted(statuses),
+            'iterations': count,
+            'queries': round(queries / count),
+            'per_second': round(count / elapsed, 1),
+            'latency_ms': latency_summary(timings),
+        }
@@ -0,0 +1,84 @@
+"""Requests per second with a connection per request, a persistent
+connection (CONN_MAX_AGE) and the per-process pool of api.db.pool.
+
+Every mode gets its own alias on a copy of the benchmark database and
+serves the queries of a title detail request between the calls Django
+makes on request_started and request_finished.
+"""
+import sqlite3
+import time
+
+import pytest
+from django.db import connection, connections
+
+from api.db.pool import close_pools
+from api.models import Title
+
+from .conftest import RESULTS, latency_summary
+
+ENGINES = {
+    'sqlite': ('django.db.backends.sqlite3', 'api.db.sqlite3'),
+    'postgresql': ('django.db.backends.postgresql', 'api.db.postgresql'),
+}
+
+
+@pytest.fixture
+def database(db, tmp_path):
+    settings_dict = dict(connection.settings_dict)
+    if connection.vendor == 'sqlite':
+        # an in-memory database is never closed, reconnecting is free
+        connection.ensure_connection()
+        target = sqlite3.connect(tmp_path / 'connections.sqlite3')
+        connection.connection.backup(target)
+        target.close()
+        settings_dict['NAME'] = str(tmp_path / 'connections.sqlite3')
+    yield settings_dict, Title.objects.values_list('pk', flat=True).first()
+    close_pools()
+
+
+def modes(settings_dict):
+    plain, pooled = ENGINES[connection.vendor]
+    return {
+        'connections per request': {'ENGINE': plain, 'CONN_MAX_AGE': 0},
+        'connections persistent': {'ENGINE': plain, 'CONN_MAX_AGE': 600},
+        'connections pooled': {'ENGINE': pooled, 'CONN_MAX_AGE': 0,
+                               'POOL': {'SIZE': 1}},
+    }
+
+
+def serve(alias, title_id):
+    db = connections[alias]
+    db.close_if_unusable_or_obsolete()
+    title = Title.objects.using(alias).with_relations().get(pk=title_id)
+    list(title.genre.all())
+    db.close_if_unusable_or_obsolete()
+
+
+def test_connection_reuse(database, request):
+    settings_dict, title_id = database
+    count = request.config.getoption('--bench-requests')
+    for name, overrides in modes(settings_dict).items():
+        alias = name.replace(' ', '_')
+        connections.databases[alias] = {**settings_dict, **overrides}
+        try:
+            serve(alias, title_id)
+            timings = []
+            started = time.perf_counter()
+            for _ in range(count):
+                request_started = time.perf_counter()
+                serve(alias, title_id)
+                timings.append((time.perf_counter() - request_started) * 1000)
+            elapsed = time.perf_counter() - started
+        finally:
+            connections[alias].close()
+            del connections[alias]
+            del connections.databases[alias]
+        RESULTS[name] = {
+            'method': 'GET',
+            'route': 'titles-detail',
+            'status': [200],
+            'iterations': count,
+            'queries': 2,
+            'per_second': round(count / elapsed, 1),
+            'latency_ms': latency_summary(timings),
+        }
@@ -0,0 +1,371 @@
+"""In-process latency and query count of every route in api/urls.py.
+
+Run with ``pytest benchmarks/``, see benchmarks/conftest.py for the
+options. Results go to --bench-output, compare two runs with
+``python benchmarks/compare.py old.json new.json``.
+"""
+import time
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from api.models import Category, Comment, Genre, Review, Title
+from api.urls import urlpatterns
+from api.views import confirmation_code_generator
+
+from .conftest import RESULTS, latency_summary
+
+User = get_user_model()
+
+PASSWORD = 'benchmark-password'
+SCENARIOS = {}
+
+
+def scenario(name, route, method='get', auth='admin'):
+    def register(prepare):
+        SCENARIOS[name] = SimpleNamespace(
+            route=route, method=method, auth=auth, prepare=prepare
+        )
+        return prepare
+    return register
+
+
+def api_routes(patterns=urlpatterns):
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names |= api_routes(pattern.url_patterns)
+        elif pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+@pytest.fixture
+def context(django_user_model):
+    title = Title.objects.annotate(
+        reviews_count=Count('reviews')
+    ).order_by('-reviews_count', 'id').first()
+    review = title.reviews.annotate(
+        comments_count=Count('comments')
+    ).order_by('-comments_count', 'id').first()
+    admin = django_user_model.objects.create(
+        email='bench-admin@yamdb.fake', username='bench-admin', role='admin'
+    )
+    admin.set_password(PASSWORD)
+    admin.save()
+    return SimpleNamespace(
+        title=title, review=review, admin=admin,
+        comment=review.comments.first(),
+        genre=Genre.objects.first(), category=Category.objects.first(),
+        user=django_user_model.objects.exclude(pk=admin.pk).first(),
+    )
+
+
+def client_for(auth, ctx):
+    client = APIClient()
+    if auth == 'admin':
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(ctx.admin)}'
+        )
+    return client
+
+
+@scenario('api root', 'api-root')
+def api_root(ctx, i):
+    return {}, None
+
+
+@scenario('titles list', 'titles-list', auth=None)
+def titles_list(ctx, i):
+    return {}, None
+
+
+@scenario('titles filtered', 'titles-list', auth=None)
+def titles_filtered(ctx, i):
+    return {}, {'category': ctx.category.slug, 'genre': ctx.genre.slug}
+
+
+@scenario('titles search', 'titles-list', auth=None)
+def titles_search(ctx, i):
+    return {}, {'search': 'Title 1'}
+
+
+@scenario('title detail', 'titles-detail', auth=None)
+def title_detail(ctx, i):
+    return {'pk': ctx.title.pk}, None
+
+
+@scenario('title stats', 'titles-stats', auth=None)
+def title_stats(ctx, i):
+    return {'pk': ctx.title.pk}, None
+
+
+@scenario('titles stats batch', 'titles-stats-batch', auth=None)
+def titles_stats_batch(ctx, i):
+    # one listing page worth of titles
+    ids = Title.objects.order_by('id').values_list('id', flat=True)[:10]
+    return {}, {'ids': ','.join(map(str, ids))}
+
+
+@scenario('title create', 'titles-list', method='post')
+def title_create(ctx, i):
+    return {}, {'name': f'New {i}', 'year': 2000,
+                'genre': [ctx.genre.slug], 'category': ctx.category.slug}
+
+
+@scenario('titles bulk', 'titles-bulk', method='post')
+def titles_bulk(ctx, i):
+    return {}, [
+        {'name': f'Bulk {i}-{number}', 'year': 2000,
+         'genre': [ctx.genre.slug], 'category': ctx.category.slug}
+        for number in range(20)
+    ]
+
+
+@scenario('title update', 'titles-detail', method='patch')
+def title_update(ctx, i):
+    return {'pk': ctx.title.pk}, {'description': f'Updated {i}'}
+
+
+@scenario('title delete', 'titles-detail', method='delete')
+def title_delete(ctx, i):
+    title = Title.objects.create(name=f'Doomed {i}', year=2000)
+    return {'pk': title.pk}, None
+
+
+@scenario('reviews list', 'reviews-list', auth=None)
+def reviews_list(ctx, i):
+    return {'title_id': ctx.title.pk}, None
+
+
+@scenario('reviews cursor', 'reviews-list', auth=None)
+def reviews_cursor(ctx, i):
+    return {'title_id': ctx.title.pk}, {'pagination': 'cursor'}
+
+
+@scenario('review detail', 'reviews-detail', auth=None)
+def review_detail(ctx, i):
+    return {'title_id': ctx.title.pk, 'pk': ctx.review.pk}, None
+
+
+@scenario('review create', 'reviews-list', method='post')
+def review_create(ctx, i):
+    title = Title.objects.create(name=f'Reviewed {i}', year=2000)
+    return {'title_id': title.pk}, {'text': 'text', 'score': 5}
+
+
+@scenario('review update', 'reviews-detail', method='patch')
+def review_update(ctx, i):
+    return ({'title_id': ctx.title.pk, 'pk': ctx.review.pk},
+            {'text': f'Updated {i}', 'score': 5})
+
+
+@scenario('review delete', 'reviews-detail', method='delete')
+def review_delete(ctx, i):
+    review = Review.objects.create(
+        title=ctx.title, author=ctx.admin, text='text', score=1
+    )
+    return {'title_id': ctx.title.pk, 'pk': review.pk}, None
+
+
+def comment_kwargs(ctx, **kwargs):
+    return dict(title_id=ctx.title.pk, review_id=ctx.review.pk, **kwargs)
+
+
+@scenario('comments list', 'comments-list', auth=None)
+def comments_list(ctx, i):
+    return comment_kwargs(ctx), None
+
+
+@scenario('comment detail', 'comments-detail', auth=None)
+def comment_detail(ctx, i):
+    return comment_kwargs(ctx, pk=ctx.comment.pk), None
+
+
+@scenario('comment create', 'comments-list', method='post')
+def comment_create(ctx, i):
+    return comment_kwargs(ctx), {'text': f'Comment {i}'}
+
+
+@scenario('comment update', 'comments-detail', method='patch')
+def comment_update(ctx, i):
+    return comment_kwargs(ctx, pk=ctx.comment.pk), {'text': f'Updated {i}'}
+
+
+@scenario('comment delete', 'comments-detail', method='delete')
+def comment_delete(ctx, i):
+    comment = Comment.objects.create(
+        review=ctx.review, author=ctx.admin, text='text'
+    )
+    return comment_kwargs(ctx, pk=comment.pk), None
+
+
+@scenario('genres list', 'genres-list', auth=None)
+def genres_list(ctx, i):
+    return {}, None
+
+
+@scenario('genre create', 'genres-list', method='post')
+def genre_create(ctx, i):
+    return {}, {'name': f'Genre {i}', 'slug': f'bench-genre-{i}'}
+
+
+@scenario('genre delete', 'genres-detail', method='delete')
+def genre_delete(ctx, i):
+    genre = Genre.objects.create(name='Doomed', slug=f'doomed-genre-{i}')
+    return {'slug': genre.slug}, None
+
+
+@scenario('categories list', 'categories-list', auth=None)
+def categories_list(ctx, i):
+    return {}, None
+
+
+@scenario('category create', 'categories-list', method='post')
+def category_create(ctx, i):
+    return {}, {'name': f'Category {i}', 'slug': f'bench-category-{i}'}
+
+
+@scenario('category delete', 'categories-detail', method='delete')
+def category_delete(ctx, i):
+    category = Category.objects.create(
+        name='Doomed', slug=f'doomed-category-{i}'
+    )
+    return {'slug': category.slug}, None
+
+
+@scenario('users list', 'users-list')
+def users_list(ctx, i):
+    return {}, None
+
+
+@scenario('user detail', 'users-detail')
+def user_detail(ctx, i):
+    return {'username': ctx.user.username}, None
+
+
+@scenario('user create', 'users-list', method='post')
+def user_create(ctx, i):
+    return {}, {'email': f'bench-new{i}@yamdb.fake',
+                'username': f'bench-new{i}'}
+
+
+@scenario('user update', 'users-detail', method='patch')
+def user_update(ctx, i):
+    return {'username': ctx.user.username}, {'bio': f'Bio {i}'}
+
+
+@scenario('user delete', 'users-detail', method='delete')
+def user_delete(ctx, i):
+    user = User.objects.create(
+        email=f'doomed{i}@yamdb.fake', username=f'doomed{i}'
+    )
+    return {'username': user.username}, None
+
+
+@scenario('users me', 'users-me')
+def users_me(ctx, i):
+    return {}, None
+
+
+@scenario('export titles', 'export')
+def export_titles(ctx, i):
+    return {'dataset': 'titles'}, None
+
+
+@scenario('leaderboard top', 'leaderboard', auth=None)
+def leaderboard_top(ctx, i):
+    return {'board': 'top'}, {'category': ctx.category.slug}
+
+
+@scenario('leaderboard trending', 'leaderboard', auth=None)
+def leaderboard_trending(ctx, i):
+    return {'board': 'trending'}, {'genre': ctx.genre.slug}
+
+
+@scenario('auth email', 'auth_email', method='post', auth=None)
+def auth_email(ctx, i):
+    return {}, {'email': f'bench-signup{i}@yamdb.fake'}
+
+
+@scenario('auth token', 'auth_token', method='post', auth=None)
+def auth_token(ctx, i):
+    user = User.objects.create(
+        email=f'bench-confirm{i}@yamdb.fake', is_active=False
+    )
+    return {}, {'email': user.email,
+                'confirmation_code':
+                    confirmation_code_generator.make_token(user)}
+
+
+@scenario('auth token batch', 'auth_token_batch', method='post')
+def auth_token_batch(ctx, i):
+    batch = []
+    for number in range(10):
+        user = User.objects.create(
+            email=f'bench-batch{i}-{number}@yamdb.fake', is_active=False
+        )
+        batch.append({'email': user.email, 'confirmation_code':
+                      confirmation_code_generator.make_token(user)})
+    return {}, batch
+
+
+@scenario('token obtain', 'token_obtain_pair', method='post', auth=None)
+def token_obtain(ctx, i):
+    return {}, {'email': ctx.admin.email, 'password': PASSWORD}
+
+
+@scenario('token refresh', 'token_refresh', method='post', auth=None)
+def token_refresh(ctx, i):
+    return {}, {'refresh': str(RefreshToken.for_user(ctx.admin))}
+
+
+def test_every_route_is_benchmarked():
+    covered = {case.route for case in SCENARIOS.values()}
+    assert api_routes() - covered == set()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name', sorted(SCENARIOS))
+def test_endpoint(name, context, settings, request):
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+    case = SCENARIOS[name]
+    client = client_for(case.auth, context)
+    iterations = request.config.getoption('--bench-iterations')
+    warm_cache = request.config.getoption('--bench-warm-cache')
+    send = getattr(client, case.method)
+    timings, queries, statuses = [], [], set()
+    # two warm-up rounds are not recorded
+    for i in range(iterations + 2):
+        kwargs, data = case.prepare(context, i)
+        url = reverse(case.route, kwargs=kwargs)
+        if not warm_cache:
+            cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = send(url, data=data,
+                            format=None if case.method == 'get' else 'json')
+            if hasattr(response, 'streaming_content'):
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        assert response.status_code < 400, (name, response.content[:200])
+        if i >= 2:
+            timings.append(elapsed * 1000)
+            queries.append(len(captured.captured_queries))
+            statuses.add(response.status_code)
+    RESULTS[name] = {
+        'method': case.method.upper(),
+        'route': case.route,
+        'status': sorted(statuses),
+        'iterations': iterations,
+        'queries': max(queries),
+        'latency_ms': latency_summary(timings),
+    }
@@ -0,0 +1,98 @@
+"""Objects per second of the serializers and of their api.fastpath
+counterparts, from the queryset to the rendered bytes.
+
+The rows are fetched, serialized and rendered as the list views do, with
+JSONRenderer for the serializers and FastJSONRenderer for the values.
+"""
+import time
+
+import pytest
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from api.fastpath import (
+    CommentValuesSerializer, ReviewValuesSerializer, TitleValuesSerializer,
+)
+from api.models import Comment, Title
+from api.renderers import FastJSONRenderer
+from api.serializers import (
+    CommentSerializer, ReviewSerializer, TitlesSerializer,
+)
+
+from .conftest import RESULTS, latency_summary
+
+
+def busiest_title():
+    return Title.objects.with_relations().annotate(
+        total=Count('reviews')
+    ).order_by('-total').first()
+
+
+def cases():
+    title = busiest_title()
+    reviews = title.reviews.select_related('author')
+    comments = Comment.objects.select_related('author')
+    return {
+        'titles': (
+            'titles-list', Title.objects.with_relations().order_by('id'),
+            TitlesSerializer, TitleValuesSerializer, {},
+        ),
+        'reviews': (
+            'reviews-list', reviews, ReviewSerializer,
+            ReviewValuesSerializer, {'title': title},
+        ),
+        'comments': (
+            'comments-list', comments.order_by('id'), CommentSerializer,
+            CommentValuesSerializer, {},
+        ),
+    }
+
+
+def serializer_path(queryset, serializer_class, context):
+    objects = list(queryset)
+    return JSONRenderer().render(
+        serializer_class(objects, many=True, context=context).data
+    ), len(objects)
+
+
+def values_path(queryset, serializer_class, context):
+    serializer = serializer_class(context=context)
+    rows = list(serializer.get_queryset(queryset))
+    return FastJSONRenderer().render(
+        serializer.to_representation(rows)
+    ), len(rows)
+
+
+@pytest.mark.parametrize('dataset', ['titles', 'reviews', 'comments'])
+def test_serializer_throughput(db, request, dataset):
+    iterations = request.config.getoption('--bench-iterations')
+    route, queryset, serializer_class, values_class, context = (
+        cases()[dataset]
+    )
+    outputs = {}
+    for mode, serve, serializer in (
+            ('drf', serializer_path, serializer_class),
+            ('values', values_path, values_class),
+    ):
+        timings, objects = [], 0
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                request_started = time.perf_counter()
+                outputs[mode], count = serve(queryset.all(), serializer,
+                                             context)
+                timings.append((time.perf_counter() - request_started) * 1000)
+                objects += count
+            elapsed = time.perf_counter() - started
+        RESULTS[f'serializer {dataset} {mode}'] = {
+            'method': 'GET',
+            'route': route,
+            'status': [200],
+            'iterations': iterations,
+            'queries': len(captured.captured_queries) // iterations,
+            'per_second': round(objects / elapsed, 1),
+            'latency_ms': latency_summary(timings),
+        }
+    assert outputs['drf'] == outputs['values']
@@ -0,0 +1,23 @@
+"""Gunicorn hooks, read from the working directory (/code in Dockerfile)."""
+import os
+import shutil
+
+
+def on_starting(server):
+    # prometheus mmap files of a previous run must not be summed again
+    path = os.environ.get('prometheus_multiproc_dir')
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+
+
+def child_exit(server, worker):
+    if os.environ.get('prometheus_multiproc_dir'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    # let the database free pooled connections of the worker right away
+    from api.db.pool import close_pools
+    close_pools()
@@ -2,9 +2,21 @@ import sys
 from os.path import abspath
 from os.path import dirname
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 
 
 pytest_plugins = [
+    'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    from api.authentication import clear_user_cache
+    cache.clear()
+    clear_user_cache()
@@ -0,0 +1,39 @@
+import pytest
+
+from api.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def category():
+    return Category.objects.create(name='Фильм', slug='movie')
+
+
+@pytest.fixture
+def genres():
+    return [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+
+
+@pytest.fixture
+def title(category, genres):
+    title = Title.objects.create(
+        name='Побег из Шоушенка', year=1994, category=category
+    )
+    title.genre.set(genres)
+    return title
+
+
+@pytest.fixture
+def review(title, user):
+    return Review.objects.create(
+        title=title, author=user, text='Ставлю десять звёзд!', score=10
+    )
+
+
+@pytest.fixture
+def comment(review, another_user):
+    return Comment.objects.create(
+        review=review, author=another_user, text='Ничего подобного'
+    )
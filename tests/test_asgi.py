@@ -0,0 +1,55 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.asgi import ASGIHandler
+
+# the body of the export is read in a thread of its own, with its own
+# connection, which only sees committed data
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@async_to_sync
+async def serve(path, user):
+    token = AccessToken.for_user(user)
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'authorization', f'Bearer {token}'.encode())],
+        'client': ('127.0.0.1', 4000),
+        'server': ('testserver', 80),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        messages.append(message)
+
+    await ASGIHandler()(scope, receive, send)
+    start, *body = messages
+    return start['status'], b''.join(part.get('body', b'') for part in body)
+
+
+class TestASGIHandler:
+
+    def test_export_streams_under_asgi(self, admin, comment):
+        status, body = serve('/api/v1/export/comments/', admin)
+        assert status == 200, \
+            'Проверьте, что выгрузка отдаётся через ASGI'
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        assert [row['id'] for row in rows] == [comment.id]
+
+    def test_other_responses(self, admin, title):
+        status, body = serve(f'/api/v1/titles/{title.id}/', admin)
+        assert status == 200
+        assert json.loads(body)['name'] == title.name
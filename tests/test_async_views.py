@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import include, path
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.async_views import async_read_routes
+from api.urls import router
+
+# what api_yamdb.asgi serves with ASYNC_READ_VIEWS
+urlpatterns = [path('api/v1/', include(async_read_routes(router.urls)))]
+
+# pool threads have their own connections, which only see committed data
+pytestmark = [
+    pytest.mark.urls(__name__),
+    pytest.mark.django_db(transaction=True),
+]
+
+
+@async_to_sync
+async def fetch(method, url, user=None, **data):
+    headers = {}
+    if user is not None:
+        # AsyncClient takes header names as they go over the wire
+        headers['authorization'] = f'Bearer {AccessToken.for_user(user)}'
+    return await getattr(AsyncClient(), method)(
+        url, data, content_type='application/json', **headers
+    )
+
+
+class TestAsyncReadViews:
+
+    def test_routes_are_async(self):
+        views = {pattern.name: pattern.callback
+                 for pattern in urlpatterns[0].url_patterns}
+        for name in ('titles-list', 'titles-detail', 'reviews-list',
+                     'comments-list'):
+            assert asyncio.iscoroutinefunction(views[name]), \
+                f'Проверьте, что {name} обслуживается асинхронной view'
+        assert not asyncio.iscoroutinefunction(views['genres-list'])
+
+    def test_same_answers(self, guest_client, title, comment):
+        review = comment.review
+        for url in (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title.id}/',
+            f'/api/v1/titles/{title.id}/reviews/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+        ):
+            response = fetch('get', url)
+            assert response.status_code == 200
+            assert response.json() == guest_client.get(url).json(), \
+                'Проверьте, что асинхронная view отвечает как синхронная'
+
+    def test_jwt_and_permissions(self, title, user):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        review = {'text': 'Отлично', 'score': 9}
+        assert fetch('post', url, **review).status_code == 401
+        response = fetch('post', url, user=user, **review)
+        assert response.status_code == 201, \
+            'Проверьте, что запись через асинхронный маршрут видит JWT'
+        assert response.json()['author'] == user.username
+        assert fetch('post', '/api/v1/titles/', user=user,
+                     name='Новый', year=2000).status_code == 403
+
+    def test_queries_of_pool_threads_are_timed(self, title):
+        response = fetch('get', f'/api/v1/titles/{title.id}/')
+        assert 'db;dur=' in response['Server-Timing']
+        assert 'desc="3 queries"' in response['Server-Timing'], \
+            'Проверьте, что запросы из потоков пула попадают в Server-Timing'
@@ -0,0 +1,117 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.views import confirmation_code_generator
+
+User = get_user_model()
+
+
+@pytest.fixture
+def inactive_user():
+    user = User(email='new@yamdb.fake', is_active=False)
+    user.set_unusable_password()
+    user.save()
+    return user
+
+
+@pytest.mark.django_db
+class TestConfirmationCode:
+
+    def post(self, client, user, code=None):
+        return client.post('/api/v1/auth/token/', {
+            'email': user.email,
+            'confirmation_code':
+                code or confirmation_code_generator.make_token(user),
+        })
+
+    def test_activates_with_one_update(self, guest_client, inactive_user):
+        with CaptureQueriesContext(connection) as context:
+            response = self.post(guest_client, inactive_user)
+        assert response.status_code == 200
+        assert 'token' in response.json()
+        queries = [query['sql'] for query in context.captured_queries]
+        assert len(queries) == 2, \
+            'Проверьте, что проверка кода делает один SELECT и один UPDATE'
+        assert 'password' not in queries[0], \
+            'Проверьте, что выбираются только нужные столбцы'
+        assert queries[1].startswith('UPDATE')
+        assert 'is_active' in queries[1] and 'password' not in queries[1]
+        inactive_user.refresh_from_db()
+        assert inactive_user.is_active
+
+    def test_code_is_used_once(self, guest_client, inactive_user):
+        code = confirmation_code_generator.make_token(inactive_user)
+        assert self.post(guest_client, inactive_user, code).status_code == 200
+        with CaptureQueriesContext(connection) as context:
+            response = self.post(guest_client, inactive_user, code)
+        assert response.status_code == 400
+        assert len(context.captured_queries) == 1, \
+            'Проверьте, что неверный код не приводит к записи в базу'
+
+    def test_concurrent_activation_wins_once(self, guest_client,
+                                             inactive_user):
+        code = confirmation_code_generator.make_token(inactive_user)
+        User.objects.filter(pk=inactive_user.pk).update(is_active=True)
+        response = self.post(guest_client, inactive_user, code)
+        assert response.status_code == 400
+
+    def test_unknown_email(self, guest_client):
+        response = guest_client.post('/api/v1/auth/token/', {
+            'email': 'nobody@yamdb.fake', 'confirmation_code': 'x'
+        })
+        assert response.status_code == 400
+
+    def test_rate_limited_per_email(self, guest_client, inactive_user,
+                                    another_user):
+        for _ in range(10):
+            response = self.post(guest_client, inactive_user, 'wrong')
+            assert response.status_code == 400
+        response = self.post(guest_client, inactive_user)
+        assert response.status_code == 429, \
+            'Проверьте, что подбор кода ограничен по email'
+        response = self.post(guest_client, another_user, 'wrong')
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestConfirmationCodeBatch:
+    url = '/api/v1/auth/token/batch/'
+
+    def test_batch(self, admin_client, inactive_user, user,
+                   django_assert_max_num_queries):
+        batch = [
+            {'email': inactive_user.email, 'confirmation_code':
+                confirmation_code_generator.make_token(inactive_user)},
+            {'email': user.email, 'confirmation_code': 'wrong'},
+            {'email': 'nobody@yamdb.fake', 'confirmation_code': 'wrong'},
+        ]
+        # a second use of the same code inside the batch
+        batch.append(dict(batch[0]))
+        with django_assert_max_num_queries(4):
+            response = admin_client.post(self.url, batch, format='json')
+        assert response.status_code == 200
+        results = response.json()
+        assert [result['email'] for result in results] == [
+            item['email'] for item in batch
+        ]
+        assert 'token' in results[0]
+        assert [result.get('error') for result in results[1:]] == [
+            'invalid code'] * 3, \
+            'Проверьте, что каждый элемент пачки проверяется отдельно'
+        inactive_user.refresh_from_db()
+        assert inactive_user.is_active
+
+    def test_only_admin(self, user_client, guest_client):
+        assert user_client.post(self.url, [], format='json'
+                                ).status_code == 403
+        assert guest_client.post(self.url, [], format='json'
+                                 ).status_code == 401
+
+    def test_rejects_bad_payload(self, admin_client):
+        response = admin_client.post(self.url, {'email': 'a@yamdb.fake'},
+                                     format='json')
+        assert response.status_code == 400
+        response = admin_client.post(self.url, [{}] * 1001, format='json')
+        assert response.status_code == 400
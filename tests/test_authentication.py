@@ -0,0 +1,68 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+def user_queries(context):
+    return [query['sql'] for query in context.captured_queries
+            if 'users_user' in query['sql']]
+
+
+@pytest.fixture
+def bearer(admin):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}'
+    )
+    return client
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+
+    def test_second_request_skips_user_query(self, bearer, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        with CaptureQueriesContext(connection) as first:
+            assert bearer.get(url).status_code == 200
+        with CaptureQueriesContext(connection) as second:
+            assert bearer.get(url).status_code == 200
+        assert len(user_queries(first)) == 1
+        assert user_queries(second) == [], \
+            'Проверьте, что пользователь берётся из кэша'
+        assert bearer.get('/api/v1/users/me/').json()['email'] == \
+            'admin@yamdb.fake'
+
+    def test_token_without_user_id(self, guest_client):
+        token = AccessToken()
+        guest_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        assert guest_client.get('/api/v1/users/me/').status_code == 401
+
+    def test_role_change_is_honored(self, bearer, admin):
+        assert bearer.get('/api/v1/users/').status_code == 200
+        admin.role = 'user'
+        admin.save()
+        assert bearer.get('/api/v1/users/').status_code == 403, \
+            'Проверьте, что сохранение пользователя сбрасывает кэш'
+
+    def test_deactivation_is_honored(self, bearer, admin):
+        assert bearer.get('/api/v1/users/me/').status_code == 200
+        admin.is_active = False
+        admin.save()
+        assert bearer.get('/api/v1/users/me/').status_code == 401
+
+    def test_other_process_changes_after_ttl(self, bearer, admin,
+                                             django_user_model, monkeypatch,
+                                             settings):
+        settings.JWT_USER_CACHE_TTL = 30
+        assert bearer.get('/api/v1/users/').status_code == 200
+        # update() sends no signal, as a save in another worker would not
+        django_user_model.objects.filter(pk=admin.pk).update(role='user')
+        assert bearer.get('/api/v1/users/').status_code == 200
+        now = time.monotonic()
+        monkeypatch.setattr(time, 'monotonic', lambda: now + 31)
+        assert bearer.get('/api/v1/users/').status_code == 403, \
+            'Проверьте, что изменения видны не позже JWT_USER_CACHE_TTL'
@@ -0,0 +1,89 @@
+import pytest
+
+from api.models import Title
+
+URL = '/api/v1/titles/bulk/'
+
+
+@pytest.mark.django_db
+class TestBulkTitles:
+
+    def test_creates_and_reports_errors(self, admin_client, category,
+                                        genres):
+        items = [
+            {'name': 'First', 'year': 2000, 'category': category.slug,
+             'genre': [genre.slug for genre in genres]},
+            {'name': 'Second', 'year': 2001, 'genre': 'drama'},
+            {'name': 'Bad genre', 'year': 2000, 'genre': ['nope']},
+            {'name': 'Bad category', 'year': 2000, 'category': 'nope'},
+            {'name': 'List category', 'year': 2000, 'category': ['a']},
+            {'name': 'Dict category', 'year': 2000, 'category': {'a': 1}},
+            {'year': 2000},
+            'not an object',
+        ]
+        response = admin_client.post(URL, items, format='json')
+        assert response.status_code == 200
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            'created', 'created', 'error', 'error', 'error', 'error',
+            'error', 'error',
+        ], 'Проверьте, что ошибки одного элемента не прерывают пачку'
+        assert results[0]['title']['category'] == {
+            'name': category.name, 'slug': category.slug
+        }
+        assert sorted(genre['slug'] for genre in
+                      results[0]['title']['genre']) == ['comedy', 'drama']
+        assert results[1]['title']['category'] is None
+        assert 'genre' in results[2]['errors']
+        assert 'category' in results[3]['errors']
+        assert results[4]['errors']['category'] == ['Expected a slug']
+        assert 'category' in results[5]['errors']
+        assert 'name' in results[6]['errors']
+        assert Title.objects.count() == 2
+        first = Title.objects.get(pk=results[0]['title']['id'])
+        assert first.genre.count() == 2
+
+    def test_resolves_slugs_once(self, admin_client, category, genres,
+                                 django_assert_max_num_queries):
+        items = [
+            {'name': f'Title {number}', 'year': 2000,
+             'category': category.slug, 'genre': ['drama', 'comedy']}
+            for number in range(50)
+        ]
+        # slugs, titles, genre rows and reading back do not grow with items
+        with django_assert_max_num_queries(12):
+            response = admin_client.post(URL, items, format='json')
+        assert all(result['status'] == 'created'
+                   for result in response.json())
+        assert Title.genre.through.objects.count() == 100
+
+    def test_upsert(self, admin_client, title, category, genres,
+                    guest_client):
+        version = title.version
+        guest_client.get(f'/api/v1/titles/{title.id}/')
+        response = admin_client.post(URL, [
+            {'id': title.id, 'name': 'Renamed', 'year': 1995,
+             'genre': ['comedy']},
+            {'id': title.id, 'name': 'Twice', 'year': 1995},
+            {'id': 10 ** 6, 'name': 'Missing', 'year': 1995},
+        ], format='json')
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            'updated', 'error', 'error'
+        ]
+        title.refresh_from_db()
+        assert title.name == 'Renamed'
+        assert title.category is None
+        assert list(title.genre.values_list('slug', flat=True)) == ['comedy']
+        assert title.version > version, \
+            'Проверьте, что обновление меняет версию (ETag) произведения'
+        assert guest_client.get(
+            f'/api/v1/titles/{title.id}/'
+        ).json()['name'] == 'Renamed'
+
+    def test_admin_only_and_limit(self, user_client, admin_client):
+        assert user_client.post(URL, [], format='json').status_code == 403
+        response = admin_client.post(URL, [{}] * 1001, format='json')
+        assert response.status_code == 400
+        response = admin_client.post(URL, {'name': 'x'}, format='json')
+        assert response.status_code == 400
@@ -0,0 +1,104 @@
+import pytest
+from django.core.cache.backends.base import memcache_key_warnings
+from django.db import transaction
+from prometheus_client import REGISTRY
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.models import Genre, Review, Title
+from api.views import TitleViewSet
+
+
+def cache_hits():
+    # what /metrics reports, counted from X-Cache by PrometheusMiddleware
+    return REGISTRY.get_sample_value(
+        'yamdb_catalog_cache_requests_total', {'result': 'hit'}
+    ) or 0
+
+
+@pytest.mark.django_db
+class TestCatalogCache:
+
+    def test_titles_list_is_cached(self, guest_client, title,
+                                   django_assert_num_queries):
+        first = guest_client.get('/api/v1/titles/')
+        assert first['X-Cache'] == 'MISS'
+        hits = cache_hits()
+        with django_assert_num_queries(0):
+            second = guest_client.get('/api/v1/titles/')
+        assert second['X-Cache'] == 'HIT', \
+            'Проверьте, что повторный запрос списка отдаётся из кэша'
+        assert second.json() == first.json()
+        assert cache_hits() == hits + 1, \
+            'Проверьте, что попадание в кэш видно в /metrics'
+
+    def test_key_includes_filters_and_page(self, guest_client, title):
+        guest_client.get('/api/v1/titles/')
+        response = guest_client.get('/api/v1/titles/?genre=comedy')
+        assert response['X-Cache'] == 'MISS'
+        response = guest_client.get('/api/v1/titles/?year=1000')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 0
+        response = guest_client.get('/api/v1/titles/?page=1')
+        assert response['X-Cache'] == 'MISS'
+        response = guest_client.get('/api/v1/titles/?unknown=1')
+        assert response['X-Cache'] == 'HIT', \
+            'Проверьте, что посторонние параметры не попадают в ключ кэша'
+
+    # the cache is invalidated once the write commits
+    @pytest.mark.django_db(transaction=True)
+    def test_review_invalidates_title(self, guest_client, title, user):
+        url = f'/api/v1/titles/{title.id}/'
+        assert guest_client.get(url).json()['rating'] is None
+        Review.objects.create(title=title, author=user, text='t', score=8)
+        response = guest_client.get(url)
+        assert response['X-Cache'] == 'MISS', \
+            'Проверьте, что новый отзыв сбрасывает кэш произведений'
+        assert response.json()['rating'] == 8
+
+    @pytest.mark.django_db(transaction=True)
+    def test_genre_change_invalidates(self, guest_client, title, genres):
+        guest_client.get('/api/v1/genres/')
+        guest_client.get(f'/api/v1/titles/{title.id}/')
+        Genre.objects.filter(pk=genres[0].pk).get().delete()
+        genres_response = guest_client.get('/api/v1/genres/')
+        title_response = guest_client.get(f'/api/v1/titles/{title.id}/')
+        assert genres_response['X-Cache'] == 'MISS'
+        assert title_response['X-Cache'] == 'MISS'
+        assert len(title_response.json()['genre']) == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_title_delete_invalidates(self, admin_client, title):
+        admin_client.get('/api/v1/titles/')
+        Title.objects.all().delete()
+        assert admin_client.get('/api/v1/titles/').json()['count'] == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_invalidated_after_commit(self, guest_client, title, user):
+        url = f'/api/v1/titles/{title.id}/'
+        guest_client.get(url)
+        with transaction.atomic():
+            Review.objects.create(title=title, author=user, text='t',
+                                  score=8)
+            # a read of the old rows now must not be cached as fresh
+            assert guest_client.get(url)['X-Cache'] == 'HIT', \
+                'Проверьте, что кэш сбрасывается только после коммита'
+        response = guest_client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 8
+
+    def test_not_found_is_not_cached(self, guest_client):
+        assert guest_client.get('/api/v1/titles/1000/').status_code == 404
+        response = guest_client.get('/api/v1/titles/1000/')
+        assert 'X-Cache' not in response
+
+    @pytest.mark.parametrize('path', [
+        '/api/v1/titles/a b/', '/api/v1/titles/²/',
+        f'/api/v1/titles/{"x" * 300}/', f'/api/v1/titles/?name={"x" * 300}',
+    ])
+    def test_keys_are_valid_for_memcached(self, path):
+        request = Request(APIRequestFactory().get(path))
+        view = TitleViewSet(request=request, format_kwarg=None)
+        key = view.get_cache_key(request)
+        assert list(memcache_key_warnings(key)) == [], \
+            'Проверьте, что ключи кэша подходят для memcached'
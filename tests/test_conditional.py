@@ -0,0 +1,135 @@
+import pytest
+
+from api.models import Comment, Review
+
+
+def revalidate(client, url, etag):
+    return client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_reviews_not_modified(self, user_client, review,
+                                  django_assert_num_queries):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        response = user_client.get(url)
+        etag = response['ETag']
+        assert etag, 'Проверьте, что список отзывов отдаёт ETag'
+        # only the title lookup, no count, no list query
+        with django_assert_num_queries(2):
+            response = revalidate(user_client, url, etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+
+    def test_review_changes_etag(self, user_client, review, another_user):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        etag = user_client.get(url)['ETag']
+
+        review.text = 'Передумал'
+        review.save()
+        response = revalidate(user_client, url, etag)
+        assert response.status_code == 200, \
+            'Проверьте, что редактирование отзыва меняет ETag'
+        etag = response['ETag']
+
+        Review.objects.create(
+            title=review.title, author=another_user, text='text'
+        )
+        response = revalidate(user_client, url, etag)
+        assert response.status_code == 200
+        assert response.json()['count'] == 2
+        etag = response['ETag']
+
+        review.delete()
+        assert revalidate(user_client, url, etag).status_code == 200
+
+    def test_review_detail(self, user_client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        response = user_client.get(url)
+        assert 'comments_version' not in response.json()
+        etag = response['ETag']
+        assert revalidate(user_client, url, etag).status_code == 304
+        review.title.name = 'Новое название'
+        review.title.save()
+        assert revalidate(user_client, url, etag).status_code == 200, \
+            'Проверьте, что изменение произведения меняет ETag отзыва'
+
+    def test_etag_depends_on_query(self, user_client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        etag = user_client.get(url)['ETag']
+        response = revalidate(user_client, url + '?page=1', etag)
+        assert response.status_code == 200
+
+    def test_comments_not_modified(self, user_client, comment,
+                                   django_assert_num_queries):
+        review = comment.review
+        url = (f'/api/v1/titles/{review.title_id}/reviews/'
+               f'{review.id}/comments/')
+        etag = user_client.get(url)['ETag']
+        with django_assert_num_queries(1):
+            assert revalidate(user_client, url, etag).status_code == 304
+
+        comment.text = 'Исправлено'
+        comment.save()
+        response = revalidate(user_client, url, etag)
+        assert response.status_code == 200, \
+            'Проверьте, что редактирование комментария меняет ETag'
+        etag = response['ETag']
+        Comment.objects.create(review=review, author=review.author, text='t')
+        assert revalidate(user_client, url, etag).status_code == 200
+
+    def test_author_rename_changes_etag(self, user_client, comment):
+        review = comment.review
+        reviews_url = f'/api/v1/titles/{review.title_id}/reviews/'
+        comments_url = f'{reviews_url}{review.id}/comments/'
+        etags = {url: user_client.get(url)['ETag']
+                 for url in (reviews_url, comments_url)}
+        review.author.save()
+        comment.author.save()
+        for url, etag in etags.items():
+            assert revalidate(user_client, url, etag).status_code == 304
+
+        for author in (review.author, comment.author):
+            author.username = f'{author.username}_renamed'
+            author.save()
+        for url, etag in etags.items():
+            response = revalidate(user_client, url, etag)
+            assert response.status_code == 200, \
+                'Проверьте, что смена имени автора меняет ETag'
+        assert response.json()['results'][0]['author'] == (
+            comment.author.username
+        )
+
+    # the cache is invalidated once the write commits
+    @pytest.mark.django_db(transaction=True)
+    def test_title_detail(self, admin_client, title, genres):
+        url = f'/api/v1/titles/{title.id}/'
+        etag = admin_client.get(url)['ETag']
+        assert revalidate(admin_client, url, etag).status_code == 304
+
+        genres[0].name = 'Трагедия'
+        genres[0].save()
+        response = revalidate(admin_client, url, etag)
+        assert response.status_code == 200, \
+            'Проверьте, что изменение жанра меняет ETag произведения'
+        etag = response['ETag']
+
+        admin_client.patch(url, data={'name': 'Новое'}, format='json')
+        response = revalidate(admin_client, url, etag)
+        assert response.status_code == 200
+        assert response.json()['name'] == 'Новое'
+
+    def test_title_list_has_no_etag(self, guest_client, title):
+        assert 'ETag' not in guest_client.get('/api/v1/titles/')
+
+    def test_missing_title(self, guest_client):
+        response = guest_client.get('/api/v1/titles/1000/reviews/')
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/abc/', '/api/v1/titles/abc/stats/',
+    ])
+    def test_title_pk_not_a_number(self, guest_client, url):
+        assert guest_client.get(url).status_code == 404, \
+            'Проверьте, что нечисловой id произведения даёт 404, а не 500'
@@ -0,0 +1,44 @@
+import pytest
+
+from api.datagen import generate, zipf_counts
+from api.models import Review, Title
+
+
+class TestZipfCounts:
+
+    def test_first_bucket_is_the_largest(self):
+        counts = zipf_counts(1000, 50, 1.1)
+        assert counts == sorted(counts, reverse=True)
+        assert counts[0] > 10 * counts[-1], \
+            'Проверьте, что распределение отзывов перекошено'
+
+    def test_cap(self):
+        assert max(zipf_counts(1000, 10, 1.1, cap=50)) == 50
+
+
+@pytest.mark.django_db
+class TestGenerate:
+
+    def test_generates_the_same_catalog_for_a_seed(self):
+        sizes = dict(users=10, categories=2, genres=3, titles=10,
+                     reviews=40, comments=20)
+        first = generate(seed=1, prefix='a', **sizes)
+        scores = list(Review.objects.filter(
+            title_id__in=first
+        ).order_by('id').values_list('score', flat=True))
+        Review.objects.all().delete()
+        Title.objects.all().delete()
+        second = generate(seed=1, prefix='b', **sizes)
+        assert len(first) == len(second) == 10
+        assert list(Review.objects.filter(
+            title_id__in=second
+        ).order_by('id').values_list('score', flat=True)) == scores
+
+    def test_most_reviewed_title_is_first(self):
+        title_ids = generate(users=20, categories=2, genres=3, titles=10,
+                             reviews=60, comments=0)
+        hottest = Title.objects.get(pk=title_ids[0])
+        assert hottest.rating_count == max(
+            Title.objects.values_list('rating_count', flat=True)
+        ), 'Проверьте, что первым возвращается самое популярное произведение'
+        assert Review.objects.count() <= 60
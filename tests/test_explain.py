@@ -0,0 +1,45 @@
+import re
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.models import Title
+
+
+def sections(output):
+    """{endpoint name: its headline and query plans}."""
+    return {
+        section.split(':', 1)[0]: section
+        for section in re.split(r'^(?=[\w ]+: GET )', output, flags=re.M)
+        if section.strip()
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class TestExplainQueries:
+
+    def test_explains_every_endpoint(self):
+        out = StringIO()
+        call_command(
+            'explain_queries', users=10, titles=20, reviews=100,
+            comments=50, stdout=out
+        )
+        output = out.getvalue()
+        for name in ('titles list', 'titles filtered', 'reviews list',
+                     'comments list', 'genres list', 'categories list'):
+            assert f'{name}: GET' in output
+        assert '-> 500' not in output
+        plans = sections(output)
+        for name, indexes in (
+                ('titles filtered', ('title_category_year_idx',
+                                     'title_genre_genre_title_idx')),
+                ('reviews list', ('review_title_pub_date_idx',)),
+                ('reviews cursor', ('review_title_pub_date_idx',)),
+                ('comments list', ('comment_review_pub_date_idx',)),
+        ):
+            for index in indexes:
+                assert index in plans[name], \
+                    f'Проверьте, что {name} использует индекс {index}'
+        assert not Title.objects.exists(), \
+            'Проверьте, что сгенерированные данные откатываются'
@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.models import Review
+
+
+def read_stream(response):
+    return b''.join(response.streaming_content).decode()
+
+
+def read_ndjson(response):
+    return [json.loads(line) for line in read_stream(response).splitlines()]
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_titles_match_api_layout(self, admin_client, review,
+                                     another_user):
+        Review.objects.create(
+            title=review.title, author=another_user, text='t', score=5
+        )
+        response = admin_client.get('/api/v1/export/titles/')
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = read_ndjson(response)
+        detail = admin_client.get(f'/api/v1/titles/{review.title_id}/')
+        assert rows == [detail.json()], \
+            'Проверьте, что выгрузка совпадает с форматом TitlesSerializer'
+
+    def test_reviews_and_comments(self, admin_client, comment):
+        review = comment.review
+        rows = read_ndjson(admin_client.get('/api/v1/export/reviews/'))
+        detail = admin_client.get(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        ).json()
+        detail['title'] = detail['title']['id']
+        assert rows == [detail]
+
+        rows = read_ndjson(admin_client.get('/api/v1/export/comments/'))
+        assert rows[0]['review'] == review.id
+        assert rows[0]['author'] == comment.author.username
+
+    def test_csv(self, admin_client, title):
+        response = admin_client.get('/api/v1/export/titles/?output=csv')
+        assert response['Content-Type'] == 'text/csv'
+        rows = list(csv.DictReader(io.StringIO(read_stream(response))))
+        assert rows[0]['genre'] == 'drama,comedy'
+        assert rows[0]['category'] == 'movie'
+
+    def test_admin_only(self, user_client, guest_client):
+        assert user_client.get('/api/v1/export/titles/').status_code == 403
+        assert guest_client.get('/api/v1/export/titles/').status_code == 401
+
+    def test_unknown_dataset(self, admin_client):
+        response = admin_client.get('/api/v1/export/users/')
+        assert response.status_code == 404
+
+    def test_command(self, title, django_assert_max_num_queries):
+        out = StringIO()
+        # titles, then genres of the first (and only) chunk
+        with django_assert_max_num_queries(2):
+            call_command('export_catalog', 'titles', chunk_size=1, stdout=out)
+        assert json.loads(out.getvalue())['id'] == title.id
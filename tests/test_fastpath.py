@@ -0,0 +1,98 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from api.fastpath import title_rating
+from api.models import Comment, Review, Title
+from api.renderers import FastJSONRenderer, orjson
+
+
+@pytest.fixture
+def catalog(category, genres, title, django_user_model):
+    # 107 / 40 = 2.675, the float is a hair below, Decimal(str()) is not
+    scores = [3] * 27 + [2] * 13
+    for number, score in enumerate(scores):
+        author = django_user_model.objects.create(
+            email=f'fast{number}@yamdb.fake', username=f'fast{number}'
+        )
+        review = Review.objects.create(
+            title=title, author=author, text=f'Отзыв {number}',
+            score=score
+        )
+        Comment.objects.create(review=review, author=author, text='Да')
+    # JSONRenderer escapes the line and paragraph separators
+    title.description = 'Строка\u2028другая\u2029'
+    title.save()
+    Title.objects.create(name='Без категории', year=2001,
+                         description='')
+    return title
+
+
+def both(client, settings, url):
+    """Bytes of the values path and of the serializer path."""
+    cache.clear()
+    fast = client.get(url)
+    cache.clear()
+    settings.FAST_READ_SERIALIZERS = False
+    slow = client.get(url)
+    settings.FAST_READ_SERIALIZERS = True
+    assert fast.status_code == slow.status_code == 200
+    return fast.content, slow.content, JSONRenderer().render(slow.data)
+
+
+@pytest.mark.django_db
+class TestValuesSerializers:
+
+    @pytest.mark.parametrize('query', [
+        '', '?year=2001', '?genre=drama', '?search=Побег', '?category=movie',
+    ])
+    def test_titles_list(self, guest_client, settings, catalog, query):
+        fast, slow, rendered = both(guest_client, settings,
+                                    f'/api/v1/titles/{query}')
+        assert fast == slow == rendered, \
+            'Проверьте, что быстрый путь отдаёт те же байты, что сериализатор'
+
+    def test_title_detail(self, guest_client, settings, catalog):
+        fast, slow, rendered = both(guest_client, settings,
+                                    f'/api/v1/titles/{catalog.id}/')
+        assert b'2.68' in fast
+        assert fast == slow == rendered
+
+    @pytest.mark.parametrize('query', ['', '?page=3', '?pagination=cursor'])
+    def test_reviews_list(self, guest_client, settings, catalog, query):
+        fast, slow, rendered = both(
+            guest_client, settings,
+            f'/api/v1/titles/{catalog.id}/reviews/{query}'
+        )
+        assert b'\\u2028' in fast
+        assert fast == slow == rendered
+
+    def test_comments_list(self, guest_client, settings, catalog):
+        review = catalog.reviews.first()
+        fast, slow, rendered = both(
+            guest_client, settings,
+            f'/api/v1/titles/{catalog.id}/reviews/{review.id}/comments/'
+        )
+        assert fast == slow == rendered
+
+    def test_missing_title(self, guest_client):
+        assert guest_client.get('/api/v1/titles/0/').status_code == 404
+
+    def test_rating_rounds_like_decimal_field(self):
+        assert title_rating(107, 40) == 2.68
+        assert title_rating(0, 0) is None
+
+
+class TestFastJSONRenderer:
+
+    @pytest.mark.skipif(orjson is None, reason='orjson is not installed')
+    def test_same_bytes(self):
+        data = {'text': 'Юникод\u2028и\u2029',
+                'items': [1, 2.5, None, True], 'nested': {1: 'int key'}}
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_indent_uses_json_renderer(self):
+        data = {'a': [1]}
+        assert FastJSONRenderer().render(
+            data, 'application/json; indent=2'
+        ) == JSONRenderer().render(data, 'application/json; indent=2')
@@ -0,0 +1,120 @@
+import pytest
+from django.core.cache import cache
+
+from api.models import Title
+
+
+@pytest.fixture
+def titles_url():
+    return '/api/v1/titles/'
+
+
+def get(client, url, status=200):
+    response = client.get(url)
+    assert response.status_code == status
+    return response.json()
+
+
+def by_id(data):
+    # the titles list has no ordering of its own
+    if 'results' in data:
+        data['results'].sort(key=lambda title: title['id'])
+    return data
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+
+    def test_titles_fields(self, guest_client, title, titles_url,
+                           django_assert_num_queries):
+        # count + page, no genres and no category join
+        with django_assert_num_queries(2) as captured:
+            results = get(guest_client,
+                          f'{titles_url}?fields=name,id')['results']
+        assert results == [{'id': title.id, 'name': title.name}], \
+            'Проверьте, что ?fields= оставляет только запрошенные поля'
+        assert 'api_category' not in captured.captured_queries[-1]['sql']
+
+    def test_nested_objects_are_references(self, guest_client, title,
+                                           titles_url):
+        detail = get(guest_client,
+                     f'{titles_url}{title.id}/?fields=genre,category')
+        assert detail['category'] == 'movie'
+        assert sorted(detail['genre']) == ['comedy', 'drama']
+        detail = get(guest_client, f'{titles_url}{title.id}/?expand=genre')
+        assert detail['category'] == 'movie'
+        assert {'name': 'Драма', 'slug': 'drama'} in detail['genre'], \
+            'Проверьте, что ?expand= разворачивает вложенные объекты'
+        assert set(detail) == {'id', 'name', 'year', 'rating',
+                               'description', 'genre', 'category'}
+
+    def test_default_is_unchanged(self, guest_client, title, titles_url):
+        detail = get(guest_client, f'{titles_url}{title.id}/')
+        assert detail['category'] == {'name': 'Фильм', 'slug': 'movie'}
+
+    def test_cache_keeps_fieldsets_apart(self, guest_client, title,
+                                         titles_url):
+        get(guest_client, titles_url)
+        results = get(guest_client, f'{titles_url}?fields=id')['results']
+        assert results == [{'id': title.id}]
+
+    def test_reviews_without_title(self, guest_client, review,
+                                   django_assert_num_queries):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        # title id and version + count + page, no genres, no users
+        with django_assert_num_queries(3) as captured:
+            results = get(guest_client,
+                          f'{url}?fields=id,title,score')['results']
+        assert results == [
+            {'id': review.id, 'title': review.title_id, 'score': 10}
+        ]
+        assert not any('users_user' in query['sql']
+                       for query in captured.captured_queries)
+        expanded = get(guest_client, f'{url}?expand=title')['results'][0]
+        assert expanded['title']['name'] == review.title.name
+        assert expanded['author'] == review.author.username
+
+    def test_review_detail(self, guest_client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        assert get(guest_client, f'{url}?fields=score,title') == {
+            'title': review.title_id, 'score': 10,
+        }
+
+    def test_comments_fields(self, guest_client, comment):
+        review = comment.review
+        url = (f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+               f'comments/?fields=text')
+        assert get(guest_client, url)['results'] == [{'text': comment.text}]
+
+    def test_unknown_field(self, guest_client, titles_url):
+        errors = get(guest_client, f'{titles_url}?fields=id,secret&expand=x',
+                     status=400)
+        assert set(errors) == {'fields', 'expand'}
+        assert 'secret' in errors['fields'][0]
+
+    def test_writes_ignore_fieldsets(self, admin_client, category, genres,
+                                     titles_url):
+        response = admin_client.post(f'{titles_url}?fields=id', {
+            'name': 'Новое', 'year': 2000, 'category': 'movie',
+            'genre': ['drama'],
+        })
+        assert response.status_code == 201
+        assert response.json()['category'] == {
+            'name': 'Фильм', 'slug': 'movie'
+        }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query', [
+    '?fields=id,genre,rating', '?expand=category',
+    '?fields=id,category&expand=',
+])
+def test_serializers_answer_like_values(guest_client, settings, title,
+                                        review, titles_url, query):
+    Title.objects.create(name='Без категории', year=2001)
+    urls = [f'{titles_url}{query}', f'{titles_url}{title.id}/{query}']
+    fast = [by_id(get(guest_client, url)) for url in urls]
+    settings.FAST_READ_SERIALIZERS = False
+    cache.clear()
+    assert [by_id(get(guest_client, url)) for url in urls] == fast, \
+        'Проверьте, что сериализаторы и быстрый путь отдают одно и то же'
@@ -0,0 +1,73 @@
+import csv
+import os
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from api.models import Category, Comment, Genre, Review, Title
+
+DATA_DIR = os.path.join(settings.BASE_DIR, 'data')
+
+
+def csv_rows(filename):
+    with open(os.path.join(DATA_DIR, filename), encoding='utf-8') as source:
+        return list(csv.DictReader(source))
+
+
+def unique_reviews():
+    reviews = {}
+    for row in csv_rows('review.csv'):
+        reviews.setdefault((row['title_id'], row['author']), row)
+    return list(reviews.values())
+
+
+@pytest.mark.django_db
+class TestImportCsv:
+
+    def test_import_data_directory(self):
+        out = StringIO()
+        call_command('import_csv', batch_size=10, stdout=out)
+
+        expected = {
+            get_user_model(): 'users.csv',
+            Category: 'category.csv',
+            Genre: 'genre.csv',
+            Title: 'titles.csv',
+            Title.genre.through: 'genre_title.csv',
+            Review: 'review.csv',
+            Comment: 'comments.csv',
+        }
+        for model, filename in expected.items():
+            rows = csv_rows(filename)
+            if model is Review:
+                rows = unique_reviews()
+            assert model.objects.count() == len(rows), \
+                f'Проверьте, что загружены все строки из {filename}'
+        assert 'rows/sec' in out.getvalue()
+
+    def test_keeps_values_from_files(self):
+        call_command('import_csv', stdout=StringIO())
+        row = csv_rows('review.csv')[0]
+        review = Review.objects.get(pk=row['id'])
+        assert review.pub_date.isoformat().startswith(
+            row['pub_date'][:19]
+        ), 'Проверьте, что дата публикации берётся из файла'
+        assert review.author_id == int(row['author'])
+
+        title = review.title
+        scores = [int(item['score']) for item in unique_reviews()
+                  if item['title_id'] == str(title.pk)]
+        assert (title.rating_sum, title.rating_count) == (
+            sum(scores), len(scores)
+        ), 'Проверьте, что рейтинг пересчитан после загрузки'
+
+        user = get_user_model().objects.get(pk=row['author'])
+        assert not user.has_usable_password()
+
+    def test_new_rows_after_import(self, user):
+        call_command('import_csv', stdout=StringIO())
+        category = Category.objects.create(name='Новая', slug='new')
+        assert category.pk > len(csv_rows('category.csv'))
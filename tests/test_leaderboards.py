@@ -0,0 +1,123 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from api.leaderboards import refresh
+from api.models import Category, Review, Title, TitleScore
+
+URL = '/api/v1/leaderboards/'
+
+
+@pytest.fixture
+def titles(category, genres, django_user_model):
+    """Three titles: 'Old' rated 9 long ago, 'Fresh' rated 7 just now
+    and 'Book' of another category rated 8 twice."""
+    book = Category.objects.create(name='Книга', slug='book')
+    authors = [
+        django_user_model.objects.create(email=f'critic{number}@yamdb.fake')
+        for number in range(2)
+    ]
+    now = timezone.now()
+    created = {}
+    for name, category_, genre, scores, age in (
+            ('Old', category, genres[0], [9], timedelta(days=20)),
+            ('Fresh', category, genres[1], [7], timedelta()),
+            ('Book', book, genres[0], [8, 8], timedelta(days=2)),
+    ):
+        title = Title.objects.create(name=name, year=2000,
+                                     category=category_)
+        title.genre.set([genre])
+        for author, score in zip(authors, scores):
+            review = Review.objects.create(title=title, author=author,
+                                           text='text', score=score)
+            Review.objects.filter(pk=review.pk).update(pub_date=now - age)
+        created[name] = title
+    return created
+
+
+def names(response):
+    assert response.status_code == 200
+    return [entry['title']['name'] for entry in response.json()]
+
+
+@pytest.mark.django_db
+class TestLeaderboards:
+
+    def test_top(self, guest_client, titles):
+        refresh()
+        assert names(guest_client.get(URL + 'top/')) == [
+            'Old', 'Book', 'Fresh'
+        ]
+        assert names(guest_client.get(URL + 'top/?category=movie')) == [
+            'Old', 'Fresh'
+        ]
+        assert names(guest_client.get(URL + 'top/?genre=drama')) == [
+            'Old', 'Book'
+        ]
+        assert names(guest_client.get(URL + 'top/?min_reviews=2')) == [
+            'Book'
+        ]
+        entry = guest_client.get(URL + 'top/?limit=1').json()
+        assert entry == [{
+            'score': 9.0, 'rating_count': 1,
+            'title': guest_client.get(
+                f'/api/v1/titles/{titles["Old"].id}/'
+            ).json(),
+        }]
+
+    def test_trending_decays_with_review_age(self, guest_client, titles):
+        refresh()
+        response = guest_client.get(URL + 'trending/')
+        assert names(response) == ['Book', 'Fresh', 'Old'], \
+            'Проверьте, что старые отзывы весят меньше свежих'
+        scores = [entry['score'] for entry in response.json()]
+        # half-life of 3 days: 2 * 8 / 2 ** (2 / 3), 7 and 9 / 2 ** (20 / 3)
+        assert scores == pytest.approx([10.079, 7.0, 0.088], abs=0.01)
+
+    def test_refresh_is_incremental(self, titles, user):
+        assert refresh() == 3
+        assert refresh() == 0
+        Review.objects.create(title=titles['Fresh'], author=user,
+                              text='text', score=1)
+        assert refresh() == 1, \
+            'Проверьте, что пересчитываются только изменённые произведения'
+        score = TitleScore.objects.get(pk=titles['Fresh'].pk)
+        assert (score.rating, score.rating_count) == (4, 2)
+        Title.objects.create(name='New', year=2000)
+        assert refresh() == 1
+        assert TitleScore.objects.count() == 4
+
+    def test_reference_moves_after_window(self, titles):
+        refresh()
+        reference = TitleScore.objects.values_list(
+            'reference', flat=True
+        ).first()
+        later = timezone.now() + timedelta(days=31)
+        assert refresh(now=later) == 3
+        assert set(TitleScore.objects.values_list(
+            'reference', flat=True
+        )) == {later}
+        assert reference < later
+
+    def test_refresh_invalidates_cache(self, guest_client, titles):
+        refresh()
+        assert names(guest_client.get(URL + 'top/'))[0] == 'Old'
+        Review.objects.filter(title=titles['Old']).delete()
+        refresh()
+        assert names(guest_client.get(URL + 'top/'))[0] == 'Book'
+
+    def test_bad_requests(self, guest_client):
+        assert guest_client.get(URL + 'worst/').status_code == 404
+        assert guest_client.get(URL + 'top/?limit=x').status_code == 400
+        assert guest_client.get(URL + 'top/?limit=1000').status_code == 400
+        assert guest_client.get(
+            URL + 'top/?min_reviews=0'
+        ).status_code == 400
+
+    def test_command(self, titles):
+        out = StringIO()
+        call_command('refresh_leaderboards', '--full', stdout=out)
+        assert out.getvalue() == '3 leaderboard rows rebuilt\n'
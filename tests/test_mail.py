@@ -0,0 +1,79 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from api.mail import backoff, deliver_pending, queue_email
+from api.models import OutgoingEmail
+
+LOCMEM = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+@pytest.fixture(autouse=True)
+def locmem(settings):
+    settings.EMAIL_BACKEND = LOCMEM
+
+
+@pytest.mark.django_db
+class TestEmailQueue:
+
+    def test_signup_only_queues(self, guest_client):
+        response = guest_client.post('/api/v1/auth/email/',
+                                     {'email': 'new@yamdb.fake'})
+        assert response.status_code == 200
+        assert mail.outbox == [], \
+            'Проверьте, что письмо не отправляется во время запроса'
+        email = OutgoingEmail.objects.get()
+        assert email.to == 'new@yamdb.fake'
+        assert response.json()['confirmation code'] in email.body
+
+    def test_batch_over_one_connection(self):
+        for number in range(3):
+            queue_email('subject', 'body', f'user{number}@yamdb.fake')
+        with mock.patch('api.mail.get_connection',
+                        wraps=mail.get_connection) as get_connection:
+            assert deliver_pending() == (3, 0)
+        assert get_connection.call_count == 1, \
+            'Проверьте, что пачка отправляется через одно соединение'
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            'user0@yamdb.fake', 'user1@yamdb.fake', 'user2@yamdb.fake'
+        ]
+        assert not OutgoingEmail.objects.filter(sent_at__isnull=True)
+        assert deliver_pending() == (0, 0)
+
+    def test_retry_with_backoff(self):
+        email = queue_email('subject', 'body', 'user@yamdb.fake')
+        with mock.patch.object(mail.get_connection().__class__,
+                               'send_messages', side_effect=OSError('down')):
+            assert deliver_pending() == (0, 1)
+        email.refresh_from_db()
+        assert email.attempts == 1
+        assert email.sent_at is None
+        assert 'down' in email.last_error
+        assert email.send_after > timezone.now() + timedelta(seconds=50), \
+            'Проверьте, что повторная отправка откладывается'
+        assert deliver_pending() == (0, 0)
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        assert deliver_pending() == (1, 0)
+        assert len(mail.outbox) == 1
+
+    def test_gives_up(self, settings):
+        settings.EMAIL_QUEUE_MAX_ATTEMPTS = 2
+        queue_email('subject', 'body', 'user@yamdb.fake')
+        OutgoingEmail.objects.update(attempts=2)
+        assert deliver_pending() == (0, 0)
+
+    def test_backoff_grows(self):
+        assert backoff(1) < backoff(2) < backoff(3)
+        assert backoff(50) == timedelta(days=1)
+
+    def test_worker_command(self):
+        queue_email('subject', 'body', 'user@yamdb.fake')
+        out = StringIO()
+        call_command('send_queued_email', once=True, stdout=out)
+        assert 'sent 1, failed 0' in out.getvalue()
+        assert len(mail.outbox) == 1
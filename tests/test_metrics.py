@@ -0,0 +1,71 @@
+import subprocess
+import sys
+
+import pytest
+from prometheus_client.parser import text_string_to_metric_families
+
+from api.metrics import MULTIPROC_DIR_ENV
+
+WORKER = '''
+from prometheus_client import Counter
+Counter('yamdb_http_requests_total', '', ['route', 'method', 'status']
+        ).labels('titles-list', 'GET', '200').inc({count})
+'''
+
+
+def scrape(client):
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    samples = {}
+    for family in text_string_to_metric_families(response.content.decode()):
+        for sample in family.samples:
+            key = (sample.name, tuple(sorted(sample.labels.items())))
+            samples[key] = sample.value
+    return samples
+
+
+def value(samples, name, **labels):
+    return samples.get((name, tuple(sorted(labels.items()))), 0)
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_requests_by_route(self, guest_client, title):
+        before = scrape(guest_client)
+        guest_client.get('/api/v1/titles/')
+        guest_client.get('/api/v1/titles/')
+        guest_client.get(f'/api/v1/titles/{title.id}/')
+        after = scrape(guest_client)
+        requests = 'yamdb_http_requests_total'
+        labels = {'route': 'titles-list', 'method': 'GET', 'status': '200'}
+        assert value(after, requests, **labels) - value(
+            before, requests, **labels
+        ) == 2, 'Проверьте, что запросы считаются по имени маршрута'
+        latency = 'yamdb_http_request_duration_seconds_count'
+        labels = {'route': 'titles-detail', 'method': 'GET'}
+        assert value(after, latency, **labels) - value(
+            before, latency, **labels
+        ) == 1
+        queries = 'yamdb_db_queries_per_request_sum'
+        assert value(after, queries, route='titles-list') - value(
+            before, queries, route='titles-list'
+        ) == 3, 'Проверьте подсчёт SQL-запросов (второй ответ из кэша)'
+        hits = 'yamdb_catalog_cache_requests_total'
+        assert value(after, hits, result='hit') - value(
+            before, hits, result='hit'
+        ) == 1
+
+    def test_sums_worker_processes(self, guest_client, tmp_path,
+                                   monkeypatch):
+        for count in (2, 3):
+            subprocess.run(
+                [sys.executable, '-c', WORKER.format(count=count)],
+                env={MULTIPROC_DIR_ENV: str(tmp_path)}, check=True,
+            )
+        monkeypatch.setenv(MULTIPROC_DIR_ENV, str(tmp_path))
+        samples = scrape(guest_client)
+        assert value(
+            samples, 'yamdb_http_requests_total',
+            route='titles-list', method='GET', status='200'
+        ) == 5, 'Проверьте, что значения воркеров суммируются'
@@ -0,0 +1,66 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Comment, Review
+
+
+@pytest.fixture
+def many_reviews(title, django_user_model):
+    for number in range(25):
+        author = django_user_model.objects.create(
+            email=f'reviewer{number}@yamdb.fake', username=f'reviewer{number}'
+        )
+        Review.objects.create(title=title, author=author, text=str(number))
+    return title.reviews.all()
+
+
+def walk(client, url):
+    ids = []
+    queries = []
+    while url:
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        queries.extend(query['sql'] for query in context.captured_queries)
+        data = response.json()
+        ids.extend(item['id'] for item in data['results'])
+        url = data['next']
+    return ids, queries
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_page_numbers_by_default(self, guest_client, title, many_reviews):
+        response = guest_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        data = response.json()
+        assert data['count'] == 25, \
+            'Проверьте, что по умолчанию используется пагинация по страницам'
+        assert 'page=2' in data['next']
+
+    def test_reviews_cursor_walk(self, guest_client, title, many_reviews):
+        ids, queries = walk(
+            guest_client,
+            f'/api/v1/titles/{title.id}/reviews/?pagination=cursor'
+        )
+        expected = list(
+            many_reviews.order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )
+        )
+        assert ids == expected, \
+            'Проверьте, что курсорная пагинация возвращает все отзывы по порядку'
+        assert not any('COUNT(' in sql.upper() for sql in queries), \
+            'Проверьте, что курсорная пагинация не выполняет COUNT'
+
+    def test_comments_cursor_walk(self, guest_client, review, user):
+        for number in range(12):
+            Comment.objects.create(review=review, author=user, text=number)
+        ids, queries = walk(
+            guest_client,
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+            f'comments/?pagination=cursor'
+        )
+        assert len(ids) == len(set(ids)) == 12
+        assert not any('COUNT(' in sql.upper() for sql in queries)
@@ -0,0 +1,138 @@
+import time
+
+import pytest
+from django.db.utils import ConnectionHandler
+
+from api.db.pool import ConnectionPool, PoolTimeout, close_pools
+
+
+class FakeConnection:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    return now
+
+
+def make_pool(check=lambda connection: True, **options):
+    return ConnectionPool(check, options.pop('size', 2), **options)
+
+
+class TestConnectionPool:
+
+    def test_reuses_returned_connection(self):
+        pool = make_pool()
+        first, opened = pool.checkout(FakeConnection)
+        assert opened
+        pool.checkin(first)
+        assert pool.checkout(FakeConnection) == (first, False), \
+            'Проверьте, что возвращённое соединение используется повторно'
+
+    def test_size_is_a_bound(self):
+        pool = make_pool(size=1, timeout=0.01)
+        connection, _ = pool.checkout(FakeConnection)
+        with pytest.raises(PoolTimeout):
+            pool.checkout(FakeConnection)
+        pool.checkin(connection)
+        assert pool.checkout(FakeConnection) == (connection, False)
+
+    def test_failed_connect_frees_the_slot(self):
+        pool = make_pool(size=1, timeout=0.01)
+
+        def connect():
+            raise OSError('refused')
+
+        with pytest.raises(OSError):
+            pool.checkout(connect)
+        assert pool.checkout(FakeConnection)[1]
+
+    def test_max_lifetime(self, clock):
+        pool = make_pool(max_lifetime=60)
+        old, _ = pool.checkout(FakeConnection)
+        pool.checkin(old)
+        clock[0] += 61
+        new, opened = pool.checkout(FakeConnection)
+        assert opened and new is not old
+        assert old.closed
+
+    def test_idle_timeout(self, clock):
+        pool = make_pool(idle_timeout=30)
+        first, _ = pool.checkout(FakeConnection)
+        second, _ = pool.checkout(FakeConnection)
+        pool.checkin(first)
+        clock[0] += 31
+        pool.checkin(second)
+        assert first.closed, \
+            'Проверьте, что долго простаивающие соединения закрываются'
+        assert pool.checkout(FakeConnection) == (second, False)
+
+    def test_health_check_after_idle(self, clock):
+        checked = []
+
+        def check(connection):
+            checked.append(connection)
+            return False
+
+        pool = make_pool(check=check, check_after=1)
+        first, _ = pool.checkout(FakeConnection)
+        pool.checkin(first)
+        assert pool.checkout(FakeConnection) == (first, False)
+        assert checked == []
+        pool.checkin(first)
+        clock[0] += 1
+        second, opened = pool.checkout(FakeConnection)
+        assert checked == [first]
+        assert opened and first.closed
+
+    def test_broken_connection_is_closed(self):
+        pool = make_pool()
+        connection, _ = pool.checkout(FakeConnection)
+        pool.checkin(connection, broken=True)
+        assert connection.closed
+        assert pool.checkout(FakeConnection)[1]
+
+
+@pytest.fixture
+def pooled(tmp_path, django_db_blocker):
+    connections = ConnectionHandler({'default': {
+        'ENGINE': 'api.db.sqlite3',
+        'NAME': str(tmp_path / 'pooled.sqlite3'),
+        'CONN_MAX_AGE': 0,
+        'POOL': {'SIZE': 2},
+    }})
+    with django_db_blocker.unblock():
+        yield connections['default']
+        connections['default'].close()
+    close_pools()
+
+
+class TestPooledBackend:
+
+    def query(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            return cursor.fetchone()
+
+    def test_request_end_returns_connection(self, pooled):
+        assert self.query(pooled) == (1,)
+        raw = pooled.connection
+        # what django does on request_finished
+        pooled.close_if_unusable_or_obsolete()
+        assert pooled.connection is None
+        assert self.query(pooled) == (1,)
+        assert pooled.connection is raw and pooled.connection_reused
+
+    def test_connection_left_in_transaction_is_dropped(self, pooled):
+        pooled.set_autocommit(False)
+        self.query(pooled)
+        raw = pooled.connection
+        pooled.close()
+        self.query(pooled)
+        assert pooled.connection is not raw
+        assert not pooled.connection_reused
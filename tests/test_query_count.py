@@ -0,0 +1,149 @@
+import pytest
+
+from api.models import Comment, Genre, Review, Title
+
+
+def make_titles(category, genres, count):
+    for number in range(count):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000, category=category
+        )
+        title.genre.set(genres)
+
+
+def make_reviews(title, django_user_model, count):
+    reviews = []
+    for number in range(count):
+        author = django_user_model.objects.create(
+            email=f'reviewer{number}@yamdb.fake', username=f'reviewer{number}'
+        )
+        reviews.append(Review.objects.create(
+            title=title, author=author, text='text', score=number % 10 + 1
+        ))
+    return reviews
+
+
+def make_comments(review, django_user_model, count):
+    for number in range(count):
+        author = django_user_model.objects.create(
+            email=f'commenter{number}@yamdb.fake',
+            username=f'commenter{number}'
+        )
+        Comment.objects.create(review=review, author=author, text='text')
+
+
+@pytest.mark.django_db
+class TestQueryCount:
+
+    @pytest.mark.parametrize('size', [1, 10])
+    def test_titles_list(self, size, admin_client, category, genres,
+                         django_assert_num_queries):
+        make_titles(category, genres, size)
+        # count + page of titles with category + prefetch of genres
+        with django_assert_num_queries(3):
+            response = admin_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert len(response.json()['results']) == size
+
+    def test_title_detail(self, admin_client, title,
+                          django_assert_num_queries):
+        # ETag version probe + title with category + prefetch of genres
+        with django_assert_num_queries(3):
+            response = admin_client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize('size', [1, 10])
+    def test_reviews_list(self, size, admin_client, title, django_user_model,
+                          django_assert_num_queries):
+        make_reviews(title, django_user_model, size)
+        # title with category + prefetch of genres + count + page of reviews
+        with django_assert_num_queries(4):
+            response = admin_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.status_code == 200
+        assert len(response.json()['results']) == size
+
+    def test_review_detail(self, admin_client, review,
+                           django_assert_num_queries):
+        with django_assert_num_queries(3):
+            response = admin_client.get(
+                f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+            )
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize('size', [1, 10])
+    def test_comments_list(self, size, admin_client, review,
+                           django_user_model, django_assert_num_queries):
+        make_comments(review, django_user_model, size)
+        with django_assert_num_queries(3):
+            response = admin_client.get(
+                f'/api/v1/titles/{review.title_id}/reviews/'
+                f'{review.id}/comments/'
+            )
+        assert response.status_code == 200
+        assert len(response.json()['results']) == size
+
+    def test_comment_detail(self, admin_client, comment,
+                            django_assert_num_queries):
+        review = comment.review
+        with django_assert_num_queries(2):
+            response = admin_client.get(
+                f'/api/v1/titles/{review.title_id}/reviews/'
+                f'{review.id}/comments/{comment.id}/'
+            )
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize('size', [1, 5])
+    def test_genres_list(self, size, admin_client,
+                         django_assert_num_queries):
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+            for number in range(size)
+        )
+        with django_assert_num_queries(2):
+            response = admin_client.get('/api/v1/genres/')
+        assert response.status_code == 200
+
+    def test_categories_list(self, admin_client, category,
+                             django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = admin_client.get('/api/v1/categories/')
+        assert response.status_code == 200
+
+    def test_users_list(self, admin_client, user, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = admin_client.get('/api/v1/users/')
+        assert response.status_code == 200
+
+    def test_user_detail(self, admin_client, user,
+                         django_assert_num_queries):
+        with django_assert_num_queries(1):
+            response = admin_client.get(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 200
+
+    def test_review_create(self, user_client, title,
+                           django_assert_num_queries):
+        # title with category + prefetch of genres + duplicate check,
+        # then savepoint, INSERT, rating UPDATE and savepoint release
+        with django_assert_num_queries(7):
+            response = user_client.post(
+                f'/api/v1/titles/{title.id}/reviews/',
+                data={'text': 'text', 'score': 7}
+            )
+        assert response.status_code == 201
+        assert response.json()['title']['rating'] == 7
+
+    def test_comment_create(self, user_client, review,
+                            django_assert_num_queries):
+        # review + INSERT + UPDATE of the review comments version
+        with django_assert_num_queries(3):
+            response = user_client.post(
+                f'/api/v1/titles/{review.title_id}/reviews/'
+                f'{review.id}/comments/',
+                data={'text': 'text'}
+            )
+        assert response.status_code == 201
+
+    def test_users_me(self, user_client, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == 200
@@ -0,0 +1,82 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.models import Review, Title
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_rating_follows_reviews(self, title, user, another_user):
+        review = Review.objects.create(
+            title=title, author=user, text='text', score=10
+        )
+        Review.objects.create(
+            title=title, author=another_user, text='text', score=5
+        )
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (15, 2), \
+            'Проверьте, что оценки новых отзывов учитываются в рейтинге'
+        assert title.rating == 7.5
+
+        review.score = 1
+        review.save()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (6, 2), \
+            'Проверьте, что изменение оценки пересчитывает рейтинг'
+
+        review.delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (5, 1), \
+            'Проверьте, что удаление отзыва пересчитывает рейтинг'
+
+    def test_review_without_score_is_ignored(self, title, user):
+        Review.objects.create(title=title, author=user, text='text')
+        title.refresh_from_db()
+        assert title.rating_count == 0
+        assert title.rating is None
+
+    def test_stale_title_save_keeps_rating(self, title, user):
+        stale = Title.objects.get(pk=title.pk)
+        Review.objects.create(title=title, author=user, text='t', score=6)
+        stale.name = 'Новое название'
+        stale.save()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (6, 1), \
+            'Проверьте, что сохранение произведения не затирает рейтинг'
+        assert title.name == 'Новое название'
+
+    def test_rebuild_ratings(self, title, user, another_user):
+        Review.objects.create(title=title, author=user, text='t', score=4)
+        Review.objects.create(
+            title=title, author=another_user, text='t', score=9
+        )
+        Title.objects.update(rating_sum=0, rating_count=0)
+
+        call_command('rebuild_ratings', stdout=StringIO())
+
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (13, 2), \
+            'Проверьте, что команда rebuild_ratings пересчитывает рейтинг'
+
+    # the cache is invalidated once the rebuild commits
+    @pytest.mark.django_db(transaction=True)
+    def test_rebuild_ratings_refreshes_responses(self, guest_client, review):
+        url = f'/api/v1/titles/{review.title_id}/'
+        Title.objects.update(rating_sum=3, rating_count=1)
+        etag = guest_client.get(url)['ETag']
+
+        call_command('rebuild_ratings', stdout=StringIO())
+
+        response = guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, \
+            'Проверьте, что rebuild_ratings меняет ETag произведений'
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 10
+
+    def test_api_returns_stored_rating(self, guest_client, review):
+        response = guest_client.get(f'/api/v1/titles/{review.title_id}/')
+        assert response.status_code == 200
+        assert response.json()['rating'] == 10
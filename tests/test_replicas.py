@@ -0,0 +1,86 @@
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+
+from api.models import Genre
+from api.routers import PIN_COOKIE, ReplicaRouter, RequestReads, _reads
+from api.views import confirmation_code_generator
+
+URL = '/api/v1/genres/'
+
+databases = pytest.mark.django_db(databases=['default', 'replica'],
+                                  transaction=True)
+
+
+@pytest.fixture(autouse=True)
+def replica(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    # the primary and the replica differ, so the answer shows who served it
+    Genre.objects.create(name='Primary', slug='primary')
+    Genre.objects.using('replica').create(name='Replica', slug='replica')
+
+
+def slugs(response):
+    assert response.status_code == 200
+    return [genre['slug'] for genre in response.json()['results']]
+
+
+@databases
+class TestReplicaRouting:
+
+    def test_reads_go_to_replica(self, guest_client):
+        assert slugs(guest_client.get(URL)) == ['replica'], \
+            'Проверьте, что GET-запросы читают из реплики'
+
+    def test_writes_go_to_primary(self, admin_client):
+        response = admin_client.post(URL, {'name': 'New', 'slug': 'new'})
+        assert response.status_code == 201
+        assert Genre.objects.using('default').filter(slug='new').exists()
+        assert not Genre.objects.using('replica').filter(
+            slug='new'
+        ).exists()
+
+    def test_client_is_pinned_after_write(self, admin_client):
+        admin_client.post(URL, {'name': 'New', 'slug': 'new'})
+        assert PIN_COOKIE in admin_client.cookies
+        assert slugs(admin_client.get(URL)) == ['primary', 'new'], \
+            'Проверьте, что после записи клиент читает из основной базы'
+
+    def test_user_is_pinned_without_cookie(self, admin_client, guest_client):
+        admin_client.post(URL, {'name': 'New', 'slug': 'new'})
+        admin_client.cookies.clear()
+        assert slugs(admin_client.get(URL)) == ['primary', 'new']
+        # not the response the admin just cached
+        cache.clear()
+        assert slugs(guest_client.get(URL)) == ['replica']
+
+    def test_token_activation_reads_primary(self, guest_client,
+                                            django_user_model):
+        user = django_user_model.objects.create(
+            email='new@yamdb.fake', username='new', is_active=False
+        )
+        response = guest_client.post('/api/v1/auth/token/', {
+            'email': user.email,
+            'confirmation_code': confirmation_code_generator.make_token(user),
+        })
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert user.is_active
+
+
+@databases
+class TestReplicaRouter:
+
+    def test_transaction_reads_primary(self, rf):
+        router = ReplicaRouter()
+        token = _reads.set(RequestReads(rf.get(URL)))
+        try:
+            assert router.db_for_read(Genre) == 'replica'
+            with transaction.atomic():
+                assert router.db_for_read(Genre) == 'default'
+            assert router.db_for_write(Genre) == 'default'
+        finally:
+            _reads.reset(token)
+
+    def test_no_request_reads_primary(self):
+        assert ReplicaRouter().db_for_read(Genre) == 'default'
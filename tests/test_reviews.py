@@ -0,0 +1,50 @@
+import pytest
+
+from api.models import Review
+from api.serializers import ReviewSerializer
+
+
+@pytest.mark.django_db
+class TestReviewUniqueness:
+
+    def test_second_review_rejected(self, user_client, review):
+        response = user_client.post(
+            f'/api/v1/titles/{review.title_id}/reviews/',
+            data={'text': 'Ещё раз', 'score': 5}
+        )
+        assert response.status_code == 400, \
+            'Проверьте, что повторный отзыв на произведение запрещён'
+        assert response.json() == {
+            'non_field_errors': ['Only one review allowed']
+        }
+
+    def test_duplicate_check_is_single_query(self, user, title, rf,
+                                             django_user_model,
+                                             django_assert_num_queries):
+        for number in range(5):
+            other = django_user_model.objects.create(
+                email=f'other{number}@yamdb.fake',
+            )
+            Review.objects.create(title=title, author=other, text='text')
+        request = rf.post('/')
+        request.user = user
+        serializer = ReviewSerializer(
+            data={'text': 'text', 'score': 5},
+            context={'request': request, 'title': title}
+        )
+        with django_assert_num_queries(1):
+            assert serializer.is_valid()
+
+    def test_concurrent_duplicate_returns_400(self, user_client, review,
+                                              monkeypatch):
+        # emulate a race: the existence check passes, the INSERT does not
+        monkeypatch.setattr(
+            ReviewSerializer, 'validate', lambda self, attrs: attrs
+        )
+        response = user_client.post(
+            f'/api/v1/titles/{review.title_id}/reviews/',
+            data={'text': 'Ещё раз', 'score': 5}
+        )
+        assert response.status_code == 400, \
+            'Проверьте, что IntegrityError превращается в ответ 400'
+        assert Review.objects.filter(title=review.title).count() == 1
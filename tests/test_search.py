@@ -0,0 +1,37 @@
+import pytest
+
+from api.models import Title
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    @pytest.fixture
+    def titles(self, category):
+        return [
+            Title.objects.create(name=name, year=2000, category=category)
+            # SQLite only folds the case of ASCII letters
+            for name in ('Escape from Alcatraz', 'Escape', 'The Great Escape',
+                         'The Godfather')
+        ]
+
+    def test_search_ranks_matches(self, guest_client, titles):
+        response = guest_client.get('/api/v1/titles/?search=escape')
+        assert response.status_code == 200
+        names = [item['name'] for item in response.json()['results']]
+        assert names == [
+            'Escape', 'Escape from Alcatraz', 'The Great Escape'
+        ], 'Проверьте, что параметр search ранжирует совпадения'
+
+    def test_name_filter_keeps_icontains(self, guest_client, titles):
+        response = guest_client.get('/api/v1/titles/?name=ESCAPE')
+        names = {item['name'] for item in response.json()['results']}
+        assert names == {'Escape from Alcatraz', 'Escape', 'The Great Escape'}
+
+    def test_search_combines_with_filters(self, guest_client, titles):
+        titles[0].year = 1994
+        titles[0].save()
+        response = guest_client.get('/api/v1/titles/?search=escape&year=1994')
+        assert [item['id'] for item in response.json()['results']] == [
+            titles[0].id
+        ]
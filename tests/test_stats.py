@@ -0,0 +1,74 @@
+import pytest
+
+from api.models import Review, Title
+
+
+@pytest.fixture
+def scored(title, user, another_user, admin):
+    for author, score in ((user, 10), (another_user, 7), (admin, None)):
+        Review.objects.create(title=title, author=author, text='text',
+                              score=score)
+    return title
+
+
+def histogram(**counts):
+    result = {str(score): 0 for score in range(1, 11)}
+    result.update(counts)
+    return result
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    def test_histogram(self, guest_client, scored,
+                       django_assert_num_queries):
+        # ETag version + the grouped query
+        with django_assert_num_queries(2):
+            response = guest_client.get(f'/api/v1/titles/{scored.id}/stats/')
+        assert response.status_code == 200
+        assert response.json() == {
+            'id': scored.id, 'count': 2, 'mean': 8.5,
+            'histogram': histogram(**{'7': 1, '10': 1}),
+        }, 'Проверьте, что отзывы без оценки не попадают в гистограмму'
+
+    # the cache is invalidated once the write commits
+    @pytest.mark.django_db(transaction=True)
+    def test_etag_and_invalidation(self, guest_client, scored, user):
+        url = f'/api/v1/titles/{scored.id}/stats/'
+        etag = guest_client.get(url)['ETag']
+        assert guest_client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == 304
+        Review.objects.filter(author=user).get().delete()
+        response = guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['histogram'] == histogram(**{'7': 1})
+
+    def test_unknown_title(self, guest_client):
+        assert guest_client.get(
+            '/api/v1/titles/100500/stats/'
+        ).status_code == 404
+        assert guest_client.get(
+            '/api/v1/titles/%C2%B2/stats/'
+        ).status_code == 404, 'Проверьте, что id вида ² даёт 404, а не 500'
+
+    def test_batch(self, guest_client, scored, django_assert_num_queries):
+        empty = Title.objects.create(name='Empty', year=2000)
+        url = f'/api/v1/titles/stats/?ids={empty.id},100500,{scored.id}'
+        with django_assert_num_queries(1):
+            response = guest_client.get(url)
+        assert response.json() == [
+            {'id': empty.id, 'count': 0, 'mean': None,
+             'histogram': histogram()},
+            {'id': scored.id, 'count': 2, 'mean': 8.5,
+             'histogram': histogram(**{'7': 1, '10': 1})},
+        ]
+        other = guest_client.get(f'/api/v1/titles/stats/?ids={empty.id}')
+        assert other['X-Cache'] == 'MISS', \
+            'Проверьте, что ids входят в ключ кэша'
+        assert len(other.json()) == 1
+
+    def test_batch_validation(self, guest_client):
+        for ids in ('', '1,x', '%C2%B2', ','.join(map(str, range(101)))):
+            response = guest_client.get(f'/api/v1/titles/stats/?ids={ids}')
+            assert response.status_code == 400
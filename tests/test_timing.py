@@ -0,0 +1,56 @@
+import json
+import logging
+
+import pytest
+
+
+def parse(header):
+    metrics = {}
+    for item in header.split(', '):
+        name, *params = item.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+@pytest.mark.django_db
+class TestServerTiming:
+
+    def test_header(self, guest_client, title, review):
+        response = guest_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        metrics = parse(response['Server-Timing'])
+        assert set(metrics) == {'db', 'serialize', 'view', 'total'}
+        assert metrics['db']['desc'] == '"4 queries"', \
+            'Проверьте, что в заголовке указано число SQL-запросов'
+        assert 0 < float(metrics['view']['dur']) <= float(
+            metrics['total']['dur']
+        )
+        assert float(metrics['serialize']['dur']) > 0
+
+    def test_log_line(self, guest_client, title, caplog):
+        with caplog.at_level(logging.INFO, logger='api.timing'):
+            guest_client.get(f'/api/v1/titles/{title.id}/')
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['path'] == f'/api/v1/titles/{title.id}/'
+        assert record['status'] == 200
+        assert record['queries'] == 3
+        assert 'sql' not in record
+        assert caplog.records[-1].levelno == logging.INFO
+
+    def test_slow_request_logs_sql(self, guest_client, title, caplog,
+                                   settings):
+        settings.REQUEST_TIMING_SLOW_QUERIES = 1
+        with caplog.at_level(logging.INFO, logger='api.timing'):
+            guest_client.get(f'/api/v1/titles/{title.id}/')
+        record = caplog.records[-1]
+        assert record.levelno == logging.WARNING
+        sql = record.timing['sql']
+        assert len(sql) == 3, \
+            'Проверьте, что медленный запрос логируется вместе с SQL'
+        assert 'api_title' in sql[0]['sql']
+
+    def test_sampling(self, guest_client, title, caplog, settings):
+        settings.REQUEST_TIMING_SAMPLE_RATE = 0
+        with caplog.at_level(logging.INFO, logger='api.timing'):
+            response = guest_client.get('/api/v1/genres/')
+        assert 'Server-Timing' not in response
+        assert not caplog.records